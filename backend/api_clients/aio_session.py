@@ -0,0 +1,104 @@
+# api_clients/aio_session.py
+
+import asyncio
+import json
+from typing import Any, Dict, Mapping, Optional
+
+import aiohttp
+
+# Configuração da sessão assíncrona compartilhada pelos clientes
+AIO_LIMIT = 100
+AIO_LIMIT_PER_HOST = 30
+AIO_DNS_TTL = 300
+
+# Retry com backoff exponencial para falhas transitórias (inclui 429)
+AIO_RETRIES = 5
+AIO_BACKOFF_FACTOR = 1.0
+AIO_BACKOFF_MAX = 120.0
+AIO_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+class AioResponse:
+    """
+    Resposta já lida do aiohttp (status, cabeçalhos e corpo), para que a
+    conexão volte ao pool antes do processamento do JSON.
+    """
+    __slots__ = ("status", "headers", "content")
+
+    def __init__(self, status: int, headers: Mapping[str, str], content: bytes):
+        self.status = status
+        self.headers = headers
+        self.content = content
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Retorna a ClientSession global, criando-a na primeira chamada
+    (deve ser chamada de dentro do event loop).
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=AIO_LIMIT,
+            limit_per_host=AIO_LIMIT_PER_HOST,
+            ttl_dns_cache=AIO_DNS_TTL
+        )
+        _session = aiohttp.ClientSession(connector=connector)
+    return _session
+
+
+async def close_session() -> None:
+    """
+    Fecha a ClientSession global (usado no shutdown da aplicação).
+    """
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Calcula a espera antes da próxima tentativa, respeitando Retry-After
+    quando o servidor o envia.
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), AIO_BACKOFF_MAX)
+        except ValueError:
+            pass
+    return min(AIO_BACKOFF_FACTOR * (2 ** attempt), AIO_BACKOFF_MAX)
+
+
+async def get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 10
+) -> AioResponse:
+    """
+    GET com retry e backoff exponencial para erros de conexão e para os
+    status em AIO_STATUS_FORCELIST.
+    Propaga aiohttp.ClientError / asyncio.TimeoutError após esgotar as tentativas.
+    """
+    session = get_session()
+    query = {k: str(v) for k, v in (params or {}).items()}
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    for attempt in range(AIO_RETRIES + 1):
+        try:
+            async with session.get(url, params=query, headers=headers, timeout=client_timeout) as resp:
+                content = await resp.read()
+                if resp.status in AIO_STATUS_FORCELIST and attempt < AIO_RETRIES:
+                    await asyncio.sleep(_backoff(attempt, resp.headers.get("Retry-After")))
+                    continue
+                return AioResponse(resp.status, resp.headers.copy(), content)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt >= AIO_RETRIES:
+                raise
+            await asyncio.sleep(_backoff(attempt))
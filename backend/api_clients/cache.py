@@ -0,0 +1,192 @@
+# api_clients/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class CacheEntry:
+    """
+    Entrada do cache: valor, tamanho aproximado em bytes, validade e
+    validadores HTTP (ETag / Last-Modified) para revalidação condicional.
+    `derived` guarda estruturas calculadas a partir do valor (ex.: índices),
+    que valem enquanto o valor não for substituído; `size` inclui a
+    estimativa delas, e `base_size` é só a do valor.
+    """
+    __slots__ = ("value", "size", "base_size", "fetched_at", "expires_at", "etag", "last_modified", "derived")
+
+    def __init__(
+        self,
+        value: Any,
+        size: int,
+        ttl: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        now = time.time()
+        self.value = value
+        self.size = size
+        self.base_size = size
+        self.fetched_at = now
+        self.expires_at = now + ttl
+        self.etag = etag
+        self.last_modified = last_modified
+        self.derived: Dict[str, Any] = {}
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class TTLCache:
+    """
+    Cache em memória com expiração por entrada (TTL) e despejo LRU limitado
+    por número de entradas e por orçamento total de bytes.
+
+    Entradas expiradas não são removidas imediatamente: continuam disponíveis
+    via `get` para que o chamador possa revalidá-las (If-None-Match /
+    If-Modified-Since) em vez de baixar o documento de novo.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Retorna a entrada (fresca ou expirada) ou None, atualizando a ordem LRU
+        e os contadores de hit/miss.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            if entry.fresh:
+                self.hits += 1
+            else:
+                self.stale += 1
+            return entry
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: float,
+        size: int = 0,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> CacheEntry:
+        """
+        Insere ou substitui uma entrada e despeja as menos usadas se o limite
+        de entradas ou de bytes for ultrapassado.
+        """
+        entry = CacheEntry(value, size, ttl, etag, last_modified)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._data[key] = entry
+            self._bytes += size
+            self._evict()
+        return entry
+
+    def revalidate(self, key: Hashable, ttl: float) -> Optional[CacheEntry]:
+        """
+        Renova a validade de uma entrada existente (ex.: após HTTP 304).
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            now = time.time()
+            entry.fetched_at = now
+            entry.expires_at = now + ttl
+            self._data.move_to_end(key)
+            self.revalidations += 1
+            return entry
+
+    def derive(
+        self,
+        key: Hashable,
+        name: str,
+        value: Any,
+        build: Callable[[Any], Any],
+        size_ratio: float = 0.0
+    ) -> Any:
+        """
+        Retorna build(value) memorizado na entrada `key` sob `name`.
+
+        Só reaproveita o resultado se `value` for o mesmo objeto guardado na
+        entrada; assim, uma revalidação (304) mantém o derivado e um documento
+        novo o descarta junto com a entrada antiga. Se a entrada não existir
+        (ou já guardar outro valor), apenas calcula sem memorizar.
+
+        O derivado memorizado é somado ao tamanho da entrada, estimado como
+        `size_ratio` × o tamanho com que o valor foi inserido.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None or entry.value is not value:
+            return build(value)
+        derived = entry.derived.get(name)
+        if derived is None:
+            derived = build(value)
+            with self._lock:
+                entry.derived[name] = derived
+                extra = int(entry.base_size * size_ratio)
+                if self._data.get(key) is entry:
+                    entry.size += extra
+                    self._bytes += extra
+                    self._evict()
+        return derived
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _evict(self) -> None:
+        # Sempre mantém ao menos a entrada mais recente, mesmo que sozinha
+        # ultrapasse o orçamento de bytes
+        while len(self._data) > 1 and (
+            len(self._data) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, old = self._data.popitem(last=False)
+            self._bytes -= old.size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna contadores de uso do cache.
+        """
+        with self._lock:
+            return {
+                "entries":       len(self._data),
+                "bytes":         self._bytes,
+                "hits":          self.hits,
+                "misses":        self.misses,
+                "stale":         self.stale,
+                "revalidations": self.revalidations,
+                "evictions":     self.evictions,
+            }
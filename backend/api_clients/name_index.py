@@ -0,0 +1,79 @@
+# api_clients/name_index.py
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Set, Tuple
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """
+    Índice em memória de nomes de autores já resolvidos (ORCID → nome),
+    com listas invertidas de trigramas. Usado como alternativa quando a
+    busca na API do ORCID falha.
+
+    Limitado a `max_entries` autores; os menos usados são descartados.
+    """
+
+    def __init__(self, normalize: Callable[[str], str], max_entries: int = 20_000):
+        self._normalize = normalize
+        self.max_entries = max_entries
+        self._names: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._postings: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, orcid: str, full_name: str) -> None:
+        """
+        Registra (ou atualiza) o nome de um autor no índice.
+        """
+        if not orcid or not full_name:
+            return
+        normalized = self._normalize(full_name)
+        with self._lock:
+            if orcid in self._names:
+                self._remove(orcid)
+            self._names[orcid] = (full_name, normalized)
+            for tri in _trigrams(normalized):
+                self._postings.setdefault(tri, set()).add(orcid)
+            while len(self._names) > self.max_entries:
+                self._remove(next(iter(self._names)))
+
+    def _remove(self, orcid: str) -> None:
+        _, normalized = self._names.pop(orcid)
+        for tri in _trigrams(normalized):
+            posting = self._postings.get(tri)
+            if posting is not None:
+                posting.discard(orcid)
+                if not posting:
+                    del self._postings[tri]
+
+    def search(self, tokens: List[str], max_results: int) -> List[Dict[str, str]]:
+        """
+        Retorna até `max_results` autores cujo nome normalizado contém todos os
+        tokens (já normalizados). A interseção das listas de trigramas reduz os
+        candidatos, que são então conferidos por substring.
+        """
+        with self._lock:
+            candidates = None
+            for tok in tokens:
+                for tri in _trigrams(tok):
+                    posting = self._postings.get(tri, set())
+                    candidates = set(posting) if candidates is None else candidates & posting
+                    if not candidates:
+                        return []
+            # Tokens com menos de 3 letras não têm trigramas: confere todos os nomes
+            pool = candidates if candidates is not None else self._names.keys()
+
+            matches: List[Tuple[str, str]] = []
+            for orcid in pool:
+                full_name, normalized = self._names[orcid]
+                if all(tok in normalized for tok in tokens):
+                    matches.append((full_name, orcid))
+        matches.sort()
+        return [{"orcid": orcid, "full_name": name} for name, orcid in matches[:max_results]]
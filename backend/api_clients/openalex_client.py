@@ -1,16 +1,25 @@
 # api_clients/openalex_client.py
 
+import asyncio
 import html
-from typing import List, Dict
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence
 import aiohttp
 import unicodedata
 import re
 import collections
-import datetime
+import logging
 
 import requests
 from fastapi import HTTPException
 
+from api_clients import aio_session
+from api_clients.cache import TTLCache
+from api_clients.rate_limit import RateLimiter
+from api_clients.single_flight import IN_FLIGHT
+from api_clients.work import Coauthor, Work
+
+logger = logging.getLogger(__name__)
+
 # OpenAlex API configuration
 OA_WORKS_URL = "https://api.openalex.org/works"
 OA_PER_PAGE = 200
@@ -20,22 +29,100 @@ OA_HEADERS = {
     "User-Agent": f"orcid-citations/1.0 (mailto:{OA_MAILTO})"
 }
 
+# Projeção (select=): campos de primeiro nível que cada chamador realmente usa.
+# Evita baixar abstract, concepts, referenced_works etc. de cada obra.
+BASIC_WORK_FIELDS = ("display_name", "publication_year", "ids", "cited_by_count")
+WORK_FIELDS = ("display_name", "publication_year", "ids", "type", "cited_by_count", "authorships")
+PUBLICATION_FIELDS = ("id", "display_name", "publication_year", "type", "cited_by_count", "authorships")
+
 
-def fetch_works_openalex(orcid_id: str) -> List[Dict]:
+def select_param(fields: Sequence[str]) -> str:
     """
-    Busca todas as obras de um autor (por ORCID) no OpenAlex e retorna
-    uma lista de dicts com { title, year, doi, cited_by_count }.
+    Monta o valor do parâmetro select= do OpenAlex.
     """
-    cursor = "*"
-    works: List[Dict] = []
-
-    while True:
-        params = {
-            "filter":    f"author.orcid:{orcid_id}",
-            "per-page":  OA_PER_PAGE,
-            "cursor":    cursor,
-            "mailto":    OA_MAILTO
-        }
+    return ",".join(fields)
+
+
+def citation_fields(tp: str) -> Sequence[str]:
+    """
+    Campos para consulta de citações: só "doi" existe como campo de primeiro
+    nível; pmid, pmcid e arxiv ficam dentro de "ids".
+    """
+    return (tp, "cited_by_count") if tp == "doi" else ("ids", "cited_by_count")
+
+
+def _works_page_params(
+    orcid_id: str,
+    cursor: str,
+    select: Optional[Sequence[str]] = None,
+    per_page: int = OA_PER_PAGE
+) -> Dict:
+    params = {
+        "filter":    f"author.orcid:{orcid_id}",
+        "per-page":  per_page,
+        "cursor":    cursor,
+        "mailto":    OA_MAILTO
+    }
+    if select:
+        params["select"] = select_param(select)
+    return params
+
+
+def _format_work_basic(item: Dict) -> Work:
+    return Work(
+        title=html.unescape(item.get("display_name", "Sem título")),
+        year=item.get("publication_year") or 0,
+        doi=(item.get("ids") or {}).get("doi"),
+        cited_by_count=item.get("cited_by_count", 0)
+    )
+
+
+def format_work_with_coauthors(item: Dict) -> Work:
+    """
+    Formata uma obra do OpenAlex (campos WORK_FIELDS) com coautores e citações.
+    """
+    # Extrai coautores com ORCID (se houver)
+    coauthors = []
+    for auth in item.get("authorships", []):
+        author = auth.get("author", {}) or {}
+        name = author.get("display_name")
+        if name:
+            coauthors.append(Coauthor(name, author.get("orcid")))
+
+    doi = (item.get("ids") or {}).get("doi")
+    return Work(
+        title=html.unescape(item.get("display_name", "Sem título")),
+        year=item.get("publication_year") or "----",
+        type=item.get("type") or "desconhecido",
+        doi=doi,
+        url=doi,
+        cited_by_count=item.get("cited_by_count", 0),
+        coauthors=coauthors
+    )
+
+
+def _page_size(max_works: Optional[int], seen: int) -> int:
+    if max_works is None:
+        return OA_PER_PAGE
+    return max(1, min(OA_PER_PAGE, max_works - seen))
+
+
+def iter_works_openalex(
+    orcid_id: str,
+    select: Optional[Sequence[str]] = None,
+    max_works: Optional[int] = None
+) -> Iterator[List[Dict]]:
+    """
+    Gera as obras (itens crus do OpenAlex) de um autor página a página,
+    seguindo o cursor sob demanda. Pedir só os campos `select` reduz o
+    payload; interromper a iteração (ou `max_works`) evita buscar as
+    páginas restantes.
+    """
+    cursor: Optional[str] = "*"
+    seen = 0
+
+    while cursor:
+        params = _works_page_params(orcid_id, cursor, select, _page_size(max_works, seen))
         resp = requests.get(OA_WORKS_URL, params=params, headers=OA_HEADERS, timeout=OA_TIMEOUT)
         if resp.status_code != 200:
             raise HTTPException(
@@ -44,235 +131,284 @@ def fetch_works_openalex(orcid_id: str) -> List[Dict]:
             )
         payload = resp.json()
 
-        for item in payload.get("results", []):
-            works.append({
-                "title":            html.unescape(item.get("display_name", "Sem título")),
-                "year":             item.get("publication_year") or 0,
-                "doi":              (item.get("ids") or {}).get("doi"),
-                "cited_by_count":   item.get("cited_by_count", 0),
-            })
+        results = payload.get("results", [])
+        if max_works is not None:
+            results = results[: max_works - seen]
+        seen += len(results)
+        if results:
+            yield results
+        if max_works is not None and seen >= max_works:
+            return
 
         cursor = (payload.get("meta") or {}).get("next_cursor")
-        if not cursor:
-            break
-
-    return works
 
 
-def format_works_from_openalex(orcid_id: str) -> List[Dict]:
+async def aiter_works_openalex(
+    orcid_id: str,
+    select: Optional[Sequence[str]] = None,
+    max_works: Optional[int] = None
+) -> AsyncIterator[List[Dict]]:
     """
-    Busca todas as obras de um autor (por ORCID) no OpenAlex e retorna
-    uma lista de dicts com:
-      - title
-      - year
-      - doi
-      - url
-      - type
-      - citations
-      - coauthors: List[ { name, orcid } ]
-    Inclui coautores (author.orcid) e número de citações.
+    Versão assíncrona de iter_works_openalex.
     """
-    cursor = "*"
-    works: List[Dict] = []
-
-    while True:
-        params = {
-            "filter":    f"author.orcid:{orcid_id}",
-            "per-page":  OA_PER_PAGE,
-            "cursor":    cursor,
-            "mailto":    OA_MAILTO
-        }
-        resp = requests.get(OA_WORKS_URL, params=params, headers=OA_HEADERS, timeout=OA_TIMEOUT)
-        if resp.status_code != 200:
+    cursor: Optional[str] = "*"
+    seen = 0
+
+    while cursor:
+        params = _works_page_params(orcid_id, cursor, select, _page_size(max_works, seen))
+        try:
+            resp = await aio_session.get(OA_WORKS_URL, params=params, headers=OA_HEADERS, timeout=OA_TIMEOUT)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise HTTPException(status_code=502, detail=f"Erro ao acessar OpenAlex: {e}")
+        if resp.status != 200:
             raise HTTPException(
                 status_code=502,
-                detail=f"Erro ao acessar OpenAlex: {resp.status_code}"
+                detail=f"Erro ao acessar OpenAlex: {resp.status}"
             )
         payload = resp.json()
 
-        for item in payload.get("results", []):
-            # Extrai coautores com ORCID (se houver)
-            coauthors = []
-            for auth in item.get("authorships", []):
-                author = auth.get("author", {}) or {}
-                name = author.get("display_name")
-                author_orcid = author.get("orcid")
-                if name:
-                    coauthors.append({
-                        "name": name,
-                        "orcid": author_orcid
-                    })
-
-            works.append({
-                "title":      html.unescape(item.get("display_name", "Sem título")),
-                "year":       item.get("publication_year") or "----",
-                "doi":        (item.get("ids") or {}).get("doi"),
-                "url":        (item.get("ids") or {}).get("doi"),
-                "type":       item.get("type") or "desconhecido",
-                "citations":  item.get("cited_by_count", 0),
-                "coauthors":  coauthors
-            })
+        results = payload.get("results", [])
+        if max_works is not None:
+            results = results[: max_works - seen]
+        seen += len(results)
+        if results:
+            yield results
+        if max_works is not None and seen >= max_works:
+            return
 
         cursor = (payload.get("meta") or {}).get("next_cursor")
-        if not cursor:
-            break
 
-    return works
+
+def fetch_works_openalex(orcid_id: str) -> List[Work]:
+    """
+    Busca todas as obras de um autor (por ORCID) no OpenAlex e retorna
+    uma lista de Work com title, year, doi e cited_by_count.
+    """
+    return [
+        _format_work_basic(item)
+        for page in iter_works_openalex(orcid_id, select=BASIC_WORK_FIELDS)
+        for item in page
+    ]
+
+
+def format_works_from_openalex(orcid_id: str) -> List[Work]:
+    """
+    Busca todas as obras de um autor (por ORCID) no OpenAlex e retorna
+    uma lista de Work com title, year, doi, url, type, cited_by_count e
+    coauthors (nome e author.orcid). Ver Work.to_openalex_dict.
+    """
+    return [
+        format_work_with_coauthors(item)
+        for page in iter_works_openalex(orcid_id, select=WORK_FIELDS)
+        for item in page
+    ]
+
+
+async def format_works_from_openalex_async(orcid_id: str) -> List[Work]:
+    """
+    Versão assíncrona de format_works_from_openalex.
+    """
+    return [
+        format_work_with_coauthors(item)
+        async for page in aiter_works_openalex(orcid_id, select=WORK_FIELDS)
+        for item in page
+    ]
 
 
 # Constantes para parsing e consulta de citações
 ID_TYPES = {"doi", "pmid", "pmcid", "arxiv"}
 CHUNK    = 50
 
-def parse_orcid_data(data: dict) -> tuple[dict[str,int], list[int]]:
-    """
-    Retorna:
-      - ids: dicionário { "<tp>:<valor_do_id>": ano_de_publicacao }
-      - no_id_years: lista de anos das obras sem identificador externo válido
-    Exemplo de chave em ids: "doi:10.1000/xyz123" → 2018
-    """
-    ids: dict[str,int] = {}
-    no_id_years: list[int] = []
-
-    for group in data.get("group", []) or []:
-        for work in group.get("work-summary", []) or []:
-            # Extrai ano de publicação (ou 0)
-            year = int(
-                (work.get("publication-date") or {}).get("year", {}).get("value", 0)
-            )
-            if not year:
-                continue
-
-            # Procura pelo primeiro ID externo do tipo suportado
-            found_id = False
-            for ext in (work.get("external-ids") or {}).get("external-id", []) or []:
-                tp = ext.get("external-id-type", "").lower()
-                if tp in ID_TYPES:
-                    valor = ext.get("external-id-value", "").strip().lower()
-                    if valor:
-                        key = f"{tp}:{valor}"
-                        ids[key] = year
-                        found_id = True
-                        break
-            if not found_id:
-                no_id_years.append(year)
-
-    return ids, no_id_years
-
-
-def fetch_citations(ids: dict[str,int]) -> dict[str,int]:
+# Cache de contagem de citações por identificador ("doi:10.x/y" → citações).
+# O OpenAlex atualiza as contagens no máximo uma vez por dia.
+CITATION_TTL = 24 * 60 * 60
+CITATION_CACHE = TTLCache(max_entries=200_000, max_bytes=32 * 1024 * 1024)
+
+
+OA_CITATIONS_TIMEOUT = 10
+# Lotes de citações em paralelo e limite do "polite pool" do OpenAlex (10 req/s)
+CITATION_CONCURRENCY = 4
+OA_RATE_LIMIT = 10
+OA_RATE_LIMITER = RateLimiter(OA_RATE_LIMIT)
+
+
+def _split_cached_citations(ids: dict[str,int]) -> tuple[dict[str,int], dict[str,list[str]]]:
     """
-    Recebe um dicionário { "<tp>:<id>": ano } e retorna { "<tp>:<id>": número_de_citações },
-    fazendo requisições ao OpenAlex em lotes de até CHUNK identificadores.
+    Separa os IDs já presentes e válidos no CITATION_CACHE dos que precisam
+    ser consultados, agrupando estes últimos por tipo.
     """
+    citations: dict[str,int] = {}
     by_type: dict[str,list[str]] = collections.defaultdict(list)
     for key in ids:
+        entry = CITATION_CACHE.get(key)
+        if entry is not None and entry.fresh:
+            citations[key] = entry.value
+            continue
         tp, val = key.split(":", 1)
         by_type[tp].append(val)
+    return citations, by_type
 
-    citations: dict[str,int] = {}
 
+def _citation_params(tp: str, chunk: list[str]) -> dict:
+    return {
+        "filter":    f"{tp}:{'|'.join(chunk)}",
+        "per-page":  len(chunk),
+        "select":    select_param(citation_fields(tp)),
+        "mailto":    OA_MAILTO
+    }
+
+
+# Prefixos de URL com que o OpenAlex devolve cada tipo de ID
+_ID_URL_PREFIXES = {
+    "doi":   ("https://doi.org/",),
+    "pmid":  ("https://pubmed.ncbi.nlm.nih.gov/",),
+    "pmcid": ("https://www.ncbi.nlm.nih.gov/pmc/articles/",),
+    "arxiv": ("https://arxiv.org/abs/", "arxiv:"),
+}
+
+
+def _id_value(tp: str, raw: str) -> str:
+    """
+    Forma comparável de um ID, venha do ORCID ("PMC123", "10.1/x") ou do
+    OpenAlex ("https://www.ncbi.nlm.nih.gov/pmc/articles/123", "https://doi.org/10.1/x").
+    """
+    value = raw.strip().lower()
+    for prefix in _ID_URL_PREFIXES.get(tp, ()):
+        value = value.removeprefix(prefix)
+    value = value.rstrip("/")
+    if tp == "pmcid":
+        value = value.removeprefix("pmc")
+    return value
+
+
+def _store_citation_chunk(tp: str, chunk: list[str], data: dict) -> dict[str,int]:
+    """
+    Extrai as contagens de uma resposta do OpenAlex, associando cada
+    resultado ao ID pedido (na forma vinda do ORCID), e grava no cache
+    todos os IDs do lote: os ausentes na resposta não existem no OpenAlex
+    e ficam com 0 citações. Só é chamada para lotes respondidos com sucesso.
+    """
+    requested = {_id_value(tp, v): v for v in chunk}
+    found: dict[str,int] = {}
+    for w in data.get("results", []):
+        raw = (w.get(tp) or (w.get("ids") or {}).get(tp) or "")
+        value = requested.get(_id_value(tp, raw))
+        if value is not None:
+            found[f"{tp}:{value}"] = w.get("cited_by_count", 0)
+
+    counts: dict[str,int] = {}
+    for v in chunk:
+        key = f"{tp}:{v}"
+        counts[key] = found.get(key, 0)
+        CITATION_CACHE.set(key, counts[key], ttl=CITATION_TTL, size=len(key))
+    return counts
+
+
+def _chunks(by_type: dict[str,list[str]]):
     for tp, vals in by_type.items():
-        local: dict[str,int] = {}
         # Divide em pedaços (chunks) de tamanho CHUNK
         for i in range(0, len(vals), CHUNK):
-            chunk = vals[i : i + CHUNK]
-            params = {
-                "filter":    f"{tp}:{'|'.join(chunk)}",
-                "per-page":  len(chunk),
-                "select":    f"{tp},cited_by_count"
-            }
-            resp = requests.get("https://api.openalex.org/works", params=params, timeout=10)
-            try:
-                resp.raise_for_status()
-            except requests.HTTPError as e:
-                print(f"Erro ao buscar citações para o lote {chunk}: {e}")
-                continue  # ou decida retry/backoff
-
-            data = resp.json()
+            yield tp, vals[i : i + CHUNK]
 
-            for w in data.get("results", []):
-                raw = (w.get(tp) or w.get("ids", {}).get(tp) or "")
-                # Caso raw seja algo como "https://doi.org/10.1000/xyz123", limpa o prefixo
-                normalized = raw.lower().lstrip("https://doi.org/")
-                key = f"{tp}:{normalized}"
-                local[key] = w.get("cited_by_count", 0)
 
-        # Garante que cada ID apareça no dicionário, mesmo que não tenha sido retornado
+def _fill_missing(citations: dict[str,int], by_type: dict[str,list[str]]) -> dict[str,int]:
+    # Garante que cada ID apareça no dicionário, mesmo que não tenha sido retornado
+    for tp, vals in by_type.items():
         for v in vals:
-            key = f"{tp}:{v}"
-            local.setdefault(key, 0)
+            citations.setdefault(f"{tp}:{v}", 0)
+    return citations
 
-        citations.update(local)
 
-    return citations
+async def _fetch_citation_chunk_async(tp: str, chunk: list[str]) -> dict[str,int]:
+    """
+    Consulta um lote no OpenAlex; lotes idênticos em andamento em outra
+    requisição são compartilhados via IN_FLIGHT.
+    """
+    return await IN_FLIGHT.do_async(
+        ("citations", tp, tuple(chunk)),
+        lambda: _request_citation_chunk_async(tp, chunk)
+    )
 
-def count_by_year(
-    ids: dict[str,int],
-    no_id_years: list[int],
-    citations: dict[str,int]
-) -> tuple[list[int], list[int], list[int]]:
+
+async def _request_citation_chunk_async(tp: str, chunk: list[str]) -> dict[str,int]:
     """
-    Agrupa publicações e citações por ano. Retorna três listas: anos, qtd_publicações, qtd_citações.
+    Consulta um lote no OpenAlex (retry/backoff, inclusive 429, em aio_session.get).
+    Em caso de falha definitiva, registra o erro e retorna {} sem gravar no cache.
     """
-    pubs = collections.Counter()
-    cites = collections.Counter()
-
-    for key, year in ids.items():
-        pubs[year] += 1
-        cites[year] += citations.get(key, 0)
-    for year in no_id_years:
-        pubs[year] += 1
-
-    years = sorted(pubs)
-    pubs_y = [pubs[y] for y in years]
-    cites_y = [cites[y] for y in years]
-    return years, pubs_y, cites_y
-
-def compute_metrics(
-    years: list[int],
-    pubs_y: list[int],
-    cites_y: list[int],
+    await OA_RATE_LIMITER.wait_async()
+    try:
+        resp = await aio_session.get(
+            OA_WORKS_URL,
+            params=_citation_params(tp, chunk),
+            headers=OA_HEADERS,
+            timeout=OA_CITATIONS_TIMEOUT
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning("Erro ao buscar citações para lote de %d IDs (%s): %s", len(chunk), tp, e)
+        return {}
+    if resp.status != 200:
+        logger.warning("Erro ao buscar citações para lote de %d IDs (%s): HTTP %d", len(chunk), tp, resp.status)
+        return {}
+    return _store_citation_chunk(tp, chunk, resp.json())
+
+
+async def fetch_citations_async(
     ids: dict[str,int],
-    no_id_years: list[int],
-    citations: dict[str,int]
-) -> dict[str, float | int]:
+    concurrency: int = CITATION_CONCURRENCY,
+    fill_missing: bool = True
+) -> dict[str,int]:
     """
-    Calcula métricas a partir dos arrays de anos, publicações, citações e dos dicionários de IDs/citações.
+    Recebe um dicionário { "<tp>:<id>": ano } e retorna { "<tp>:<id>": número_de_citações },
+    fazendo requisições ao OpenAlex em lotes de até CHUNK identificadores,
+    com até `concurrency` lotes em paralelo e respeitando OA_RATE_LIMIT.
+    Identificadores presentes e válidos no CITATION_CACHE não são consultados de novo.
+    IDs de lotes que falharam entram com 0 citações; com fill_missing=False
+    ficam de fora, para que o chamador não os trate como respondidos.
     """
-    works_count     = sum(pubs_y)
-    citations_count = sum(cites_y)
-
-    average_citations = (citations_count / works_count) if works_count else 0.0
+    citations, by_type = _split_cached_citations(ids)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-    current_year = datetime.date.today().year
-    cutoff_year  = current_year - 2
-    recent_works = sum(pub for yr, pub in zip(years, pubs_y) if yr >= cutoff_year)
-    recent_cites = sum(cit for yr, cit in zip(years, cites_y) if yr >= cutoff_year)
-    impact_factor_2y = (recent_cites / recent_works) if recent_works else 0.0
+    async def run(tp: str, chunk: list[str]) -> dict[str,int]:
+        async with semaphore:
+            return await _fetch_citation_chunk_async(tp, chunk)
 
-    all_cits = list(citations.values()) + [0]*len(no_id_years)
-    all_cits.sort(reverse=True)
+    for found in await asyncio.gather(*(run(tp, chunk) for tp, chunk in _chunks(by_type))):
+        citations.update(found)
 
-    h = 0
-    for i, c in enumerate(all_cits, 1):
-        if c >= i:
-            h = i
-        else:
-            break
+    return _fill_missing(citations, by_type) if fill_missing else citations
 
-    i10 = sum(1 for c in all_cits if c >= 10)
-    most_cited = all_cits[0] if all_cits else 0
 
-    impact_factor_2y = float(f"{impact_factor_2y:.2f}")
-    average_citations = float(f"{average_citations:.2f}")
+async def fetch_works_by_doi_async(
+    dois: List[str],
+    fields: Sequence[str] = PUBLICATION_FIELDS,
+    concurrency: int = CITATION_CONCURRENCY
+) -> List[Dict]:
+    """
+    Busca várias obras de uma vez pelo filtro doi:a|b|c, em lotes de até
+    CHUNK DOIs, com até `concurrency` lotes em paralelo e respeitando
+    OA_RATE_LIMIT. O campo "doi" é sempre incluído no select para que o
+    chamador possa associar cada resultado ao DOI pedido.
+    Lança HTTPException(502) se algum lote falhar.
+    """
+    select = tuple(fields) if "doi" in fields else (*fields, "doi")
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-    return {
-        "total_publicacoes":     works_count,
-        "total_citacoes":        citations_count,
-        "media_citacoes":        average_citations,
-        "fator_de_impacto":      impact_factor_2y,
-        "h_index":               h,
-        "i10_index":             i10,
-        "pesquisa_mais_citada":  most_cited
-    }
+    async def run(chunk: List[str]) -> List[Dict]:
+        async with semaphore:
+            await OA_RATE_LIMITER.wait_async()
+            params = {
+                "filter":    f"doi:{'|'.join(chunk)}",
+                "per-page":  len(chunk),
+                "select":    select_param(select),
+                "mailto":    OA_MAILTO
+            }
+            try:
+                resp = await aio_session.get(OA_WORKS_URL, params=params, headers=OA_HEADERS, timeout=OA_TIMEOUT)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise HTTPException(status_code=502, detail=f"Erro ao acessar OpenAlex: {e}")
+            if resp.status != 200:
+                raise HTTPException(status_code=502, detail=f"Erro ao acessar OpenAlex: {resp.status}")
+            return resp.json().get("results", [])
+
+    pages = await asyncio.gather(*(run(dois[i : i + CHUNK]) for i in range(0, len(dois), CHUNK)))
+    return [item for page in pages for item in page]
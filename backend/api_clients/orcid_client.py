@@ -1,54 +1,159 @@
 # api_clients/orcid_client.py
 
+import asyncio
 import html
-from typing import List, Dict, Optional
+import logging
+import os
+from urllib.parse import quote
+from typing import Any, Callable, List, Dict, Optional
 
-import requests
+import aiohttp
 import unicodedata
 from fastapi import HTTPException
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
+
+from api_clients import aio_session
+from api_clients.cache import CacheEntry, TTLCache
+from api_clients.name_index import NameIndex
+from api_clients.single_flight import IN_FLIGHT
+from api_clients.work import Coauthor, Work
+
+logger = logging.getLogger(__name__)
 
 # ORCID API configuration
 BASE_URL = "https://pub.orcid.org/v3.0"
 HEADERS = {"Accept": "application/json"}
 TIMEOUT = 10
+# Endpoint em lote /works/{put-codes} aceita até 100 put-codes por chamada
+BULK_WORKS_SIZE = 100
+BULK_WORKS_CONCURRENCY = 4
+
+# Cache de respostas do ORCID, chaveado por (orcid_id, section).
+# O orçamento é de memória residente estimada: o dict Python de uma resposta
+# ocupa cerca de PARSED_SIZE_FACTOR vezes o JSON recebido
+CACHE_MAX_ENTRIES = 1024
+CACHE_MAX_BYTES = int(os.environ.get("ORCID_CACHE_MAX_MB", 96)) * 1024 * 1024
+PARSED_SIZE_FACTOR = 7
+CACHE_DEFAULT_TTL = 10 * 60
+# TTL (segundos) por seção; "" é o registro completo e "work" cobre /work/{put-code}
+SECTION_TTLS = {
+    "":            30 * 60,
+    "person":      60 * 60,
+    "keywords":    60 * 60,
+    "employments": 6 * 60 * 60,
+    "educations":  6 * 60 * 60,
+    "works":       15 * 60,
+    "work":        60 * 60,
+}
+ORCID_CACHE = TTLCache(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES)
+
+def section_ttl(section: str) -> int:
+    """
+    Retorna o TTL de cache da seção (ex.: "work/123" usa o TTL de "work").
+    """
+    return SECTION_TTLS.get(section.split("/", 1)[0], CACHE_DEFAULT_TTL)
 
-def create_session(
-    retries: int = 5,
-    backoff_factor: float = 1.0,
-    status_forcelist: tuple = (429, 500, 502, 503, 504)
-) -> requests.Session:
+def _orcid_url(orcid_id: str, section: str = "") -> str:
+    return f"{BASE_URL}/{orcid_id}/{section}" if section else f"{BASE_URL}/{orcid_id}"
+
+def _conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
     """
-    Cria uma Session do requests com retry configurado.
+    Monta os cabeçalhos da requisição, com If-None-Match / If-Modified-Since
+    quando há uma entrada expirada no cache para revalidar.
     """
-    session = requests.Session()
-    retry = Retry(
-        total=retries,
-        backoff_factor=backoff_factor,
-        status_forcelist=status_forcelist,
-        allowed_methods=["GET"]
+    headers = dict(HEADERS)
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+def _store_response(key: tuple, section: str, data: dict, content: bytes, headers) -> None:
+    ORCID_CACHE.set(
+        key,
+        data,
+        ttl=section_ttl(section),
+        size=len(content) * PARSED_SIZE_FACTOR,
+        etag=headers.get("ETag"),
+        last_modified=headers.get("Last-Modified")
     )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
-    return session
 
-# Sessão global para reuso
-SESSION = create_session()
+async def _request_orcid_async(orcid_id: str, section: str, entry: Optional[CacheEntry]) -> dict:
+    key = (orcid_id, section)
+    try:
+        resp = await aio_session.get(
+            _orcid_url(orcid_id, section),
+            headers=_conditional_headers(entry),
+            timeout=TIMEOUT
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise HTTPException(status_code=502, detail=f"Erro ao acessar ORCID: {e}")
+
+    if resp.status == 304 and entry is not None:
+        ORCID_CACHE.revalidate(key, section_ttl(section))
+        return entry.value
+    if resp.status != 200:
+        raise HTTPException(status_code=502, detail=f"Erro ao acessar ORCID: {resp.status}")
+    data = resp.json()
+
+    _store_response(key, section, data, resp.content, resp.headers)
+    return data
 
-def fetch_orcid(orcid_id: str, section: str = "") -> dict:
+async def fetch_orcid_async(orcid_id: str, section: str = "") -> dict:
     """
-    Busca o registro ORCID completo ou uma seção específica.
+    Busca o registro ORCID completo ou uma seção específica, pela sessão
+    aiohttp compartilhada.
+    Respostas ficam no ORCID_CACHE pelo TTL da seção; entradas expiradas são
+    revalidadas com If-None-Match / If-Modified-Since. Chamadas concorrentes
+    para o mesmo recurso compartilham uma única requisição (IN_FLIGHT).
+    O dict retornado é compartilhado pelo cache e não deve ser modificado.
     Lança HTTPException(502) em caso de erro de comunicação.
     """
-    url = f"{BASE_URL}/{orcid_id}/{section}" if section else f"{BASE_URL}/{orcid_id}"
-    try:
-        resp = SESSION.get(url, headers=HEADERS, timeout=TIMEOUT)
-        resp.raise_for_status()
-        return resp.json()
-    except requests.RequestException as e:
-        raise HTTPException(status_code=502, detail=f"Erro ao acessar ORCID: {e}")
+    entry = ORCID_CACHE.get((orcid_id, section))
+    if entry is not None and entry.fresh:
+        return entry.value
+    return await IN_FLIGHT.do_async(
+        ("orcid", orcid_id, section),
+        lambda: _request_orcid_async(orcid_id, section, entry)
+    )
+
+def derive_orcid(
+    orcid_id: str,
+    section: str,
+    data: dict,
+    name: str,
+    build: Callable[[dict], Any],
+    size_ratio: float = 0.5
+) -> Any:
+    """
+    Retorna build(data) memorizado junto ao documento `data` no ORCID_CACHE,
+    para que estruturas derivadas (ex.: índices) sejam calculadas uma vez por
+    versão do documento em vez de a cada requisição. O derivado conta no
+    orçamento do cache como `size_ratio` × o tamanho estimado do documento.
+    """
+    return ORCID_CACHE.derive((orcid_id, section), name, data, build, size_ratio)
+
+# Seções do registro completo e onde cada uma fica no JSON do ORCID
+RECORD_SECTIONS = {
+    "person":      ("person",),
+    "keywords":    ("person", "keywords"),
+    "employments": ("activities-summary", "employments"),
+    "educations":  ("activities-summary", "educations"),
+    "works":       ("activities-summary", "works"),
+}
+
+def split_record_sections(record: dict) -> Dict[str, Optional[dict]]:
+    """
+    Extrai do registro completo (/{orcid_id}) as seções que também podem ser
+    buscadas separadamente. Seções ausentes no registro ficam como None.
+    """
+    sections: Dict[str, Optional[dict]] = {}
+    for section, path in RECORD_SECTIONS.items():
+        node = record
+        for part in path:
+            node = node.get(part) if isinstance(node, dict) else None
+        sections[section] = node if isinstance(node, dict) else None
+    return sections
 
 def normalize_name(text: str) -> str:
     """
@@ -59,51 +164,86 @@ def normalize_name(text: str) -> str:
     only_ascii = nfkd.encode('ASCII', 'ignore').decode('ASCII')
     return only_ascii.lower()
 
-def search_orcid_by_name(query: str, max_results: int = 15) -> List[Dict[str, str]]:
-    """
-    Pesquisa autores no ORCID cujo nome contenha todos os termos da query.
-    Usa AND na query da API e filtra localmente para garantir coerência.
-    Retorna lista de dicts {"orcid": ..., "full_name": ...}.
-    """
-    # Normaliza tokens
-    tokens = [normalize_name(tok) for tok in query.split() if tok.strip()]
-    if not tokens:
-        return []
-    
-    # monta query com AND entre termos e URL-encode
-    lucene_q = " AND ".join(tokens)
-    q_encoded = requests.utils.quote(lucene_q)
-    url = f"{BASE_URL}/search/?q={q_encoded}&rows={max_results}"
+# Busca por nome: resultados por query e índice de nomes já resolvidos
+SEARCH_TTL = 10 * 60
+SEARCH_CACHE = TTLCache(max_entries=2048)
+NAME_INDEX = NameIndex(normalize_name)
 
-    # chama API ORCID
-    try:
-        resp = SESSION.get(url, headers=HEADERS, timeout=TIMEOUT)
-        resp.raise_for_status()
-    except requests.RequestException as e:
-        raise HTTPException(status_code=502, detail=f"Erro na ORCID API: {e}")
+def _search_tokens(query: str) -> List[str]:
+    return [normalize_name(tok) for tok in query.split() if tok.strip()]
 
-    data = resp.json()
-    raw = data.get("result", []) or []
+def _expanded_search_url(tokens: List[str], max_results: int) -> str:
+    # monta query com AND entre termos e URL-encode
+    lucene_q = " AND ".join(tokens)
+    q_encoded = quote(lucene_q)
+    return f"{BASE_URL}/expanded-search/?q={q_encoded}&rows={max_results}"
 
-    # extrai ORCID + full_name
+def _names_from_expanded_search(data: dict, tokens: List[str]) -> List[Dict[str, str]]:
+    """
+    Extrai ORCID + full_name do /expanded-search (que já traz os nomes),
+    registra-os no NAME_INDEX e mantém só os que contêm TODOS os tokens.
+    """
     output: List[Dict[str, str]] = []
-    for item in raw:
-        orcid_id = item.get("orcid-identifier", {}).get("path")
+    for item in (data or {}).get("expanded-result", []) or []:
+        orcid_id = item.get("orcid-id")
         if not orcid_id:
             continue
-        try:
-            record = fetch_orcid(orcid_id)
-            name_data = format_name(record)
-            full_name = name_data.get("full_name", "") or ""
-        except Exception:
-            full_name = ""
+        given = item.get("given-names") or ""
+        family = item.get("family-names") or ""
+        full_name = f"{given} {family}".strip()
+        NAME_INDEX.add(orcid_id, full_name)
         output.append({"orcid": orcid_id, "full_name": full_name})
 
     # filtra localmente: mantém só itens que contenham TODOS os tokens
-    output = [
+    return [
         o for o in output
         if all(tok in normalize_name(o["full_name"]) for tok in tokens)
     ]
+
+def _cached_search(tokens: List[str], max_results: int) -> Optional[List[Dict[str, str]]]:
+    """
+    Resultado ainda válido da mesma query no SEARCH_CACHE, se houver.
+    """
+    entry = SEARCH_CACHE.get((" ".join(tokens), max_results))
+    if entry is not None and entry.fresh:
+        return entry.value
+    return None
+
+def _search_fallback(tokens: List[str], max_results: int, error: HTTPException) -> List[Dict[str, str]]:
+    """
+    Com a API fora do ar, responde com os nomes já conhecidos no NAME_INDEX
+    (sem a ordem de relevância do ORCID); sem nenhum, propaga o erro.
+    """
+    local = NAME_INDEX.search(tokens, max_results)
+    if not local:
+        raise error
+    logger.warning("Busca por nome respondida pelo índice local: %s", error.detail)
+    return local
+
+async def search_orcid_by_name_async(query: str, max_results: int = 15) -> List[Dict[str, str]]:
+    """
+    Pesquisa autores no ORCID cujo nome contenha todos os termos da query.
+    Usa AND na query do /expanded-search (uma única chamada, com nomes inline)
+    e filtra localmente para garantir coerência.
+    Retorna lista de dicts {"orcid": ..., "full_name": ...}.
+    """
+    tokens = _search_tokens(query)
+    if not tokens:
+        return []
+
+    cached = _cached_search(tokens, max_results)
+    if cached is not None:
+        return cached
+
+    try:
+        resp = await aio_session.get(_expanded_search_url(tokens, max_results), headers=HEADERS, timeout=TIMEOUT)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return _search_fallback(tokens, max_results, HTTPException(status_code=502, detail=f"Erro na ORCID API: {e}"))
+    if resp.status != 200:
+        return _search_fallback(tokens, max_results, HTTPException(status_code=502, detail=f"Erro na ORCID API: {resp.status}"))
+
+    output = _names_from_expanded_search(resp.json(), tokens)
+    SEARCH_CACHE.set((" ".join(tokens), max_results), output, ttl=SEARCH_TTL)
     return output
 
 def format_name(data: dict) -> Dict[str, str]:
@@ -256,93 +396,91 @@ def format_education_and_qualifications(data: dict) -> List[Dict]:
             })
     return out
 
-def format_works(data: dict) -> List[Dict]:
+def format_works(data: dict) -> List[Work]:
     """
     Formata lista de obras de /{orcid_id}/works (resumo de works-group).
     """
-    works: List[Dict] = []
+    works: List[Work] = []
     for group in data.get("group", []) or []:
         for summary in group.get("work-summary", []) or []:
-            title = html.unescape(
-                (summary.get("title") or {}).get("title", {}).get("value", "Sem título")
-            )
-            year = (summary.get("publication-date") or {}).get("year", {}).get("value", "----")
-            work_type = summary.get("type") or "desconhecido"
-            container = (summary.get("journal-title") or {}).get("value")
-            doi = None
-            for ext in (summary.get("external-ids") or {}).get("external-id", []):
-                if ext.get("external-id-type", "").lower() == "doi":
-                    doi = ext.get("external-id-value")
-                    break
-            url = (summary.get("url") or {}).get("value")
-            path = summary.get("path")
-            works.append({
-                "title":     title,
-                "year":      year,
-                "type":      work_type,
-                "container": container,
-                "doi":       doi,
-                "url":       url,
-                "path":      path,
-            })
+            works.append(format_work(summary))
     return works
 
-def format_works_with_contributors(orcid_id: str, limit: int = 10) -> List[Dict]:
+def _external_doi(node: dict) -> Optional[str]:
+    for ext in (node.get("external-ids") or {}).get("external-id", []) or []:
+        if ext.get("external-id-type", "").lower() == "doi":
+            return ext.get("external-id-value")
+    return None
+
+def format_work(node: dict, coauthors: Optional[List[Coauthor]] = None) -> Work:
     """
-    Busca detalhes completos de até `limit` obras com coautores via /work/{put-code}.
+    Formata um resumo de obra (work-summary) ou uma obra completa.
     """
-    works: List[Dict] = []
-    summary_data = fetch_orcid(orcid_id, section="works") or {}
-    count = 0
+    return Work(
+        title=html.unescape(
+            (node.get("title") or {}).get("title", {}).get("value", "Sem título")
+        ),
+        year=(node.get("publication-date") or {}).get("year", {}).get("value", "----"),
+        type=node.get("type") or "desconhecido",
+        container=(node.get("journal-title") or {}).get("value"),
+        doi=_external_doi(node),
+        url=(node.get("url") or {}).get("value"),
+        path=node.get("path"),
+        coauthors=coauthors
+    )
 
+def _format_work_detail(detail: dict) -> Work:
+    """
+    Formata uma obra completa (/work/{put-code}), incluindo coautores.
+    """
+    contributors = []
+    for contrib in (detail.get("contributors") or {}).get("contributor", []):
+        credit = contrib.get("credit-name")
+        name = credit.get("value") if isinstance(credit, dict) else None
+        orcid = (contrib.get("contributor-orcid") or {}).get("path")
+        if name:
+            contributors.append(Coauthor(name, orcid))
+    return format_work(detail, contributors)
+
+def _put_code_batches(summary_data: dict, limit: Optional[int]) -> List[List[str]]:
+    """
+    Lista os put-codes do resumo de obras (até `limit`) em lotes de BULK_WORKS_SIZE.
+    """
+    put_codes: List[str] = []
     for group in summary_data.get("group", []) or []:
         for summary in group.get("work-summary", []) or []:
-            if count >= limit:
-                return works
             put_code = summary.get("put-code")
-            if not put_code:
-                continue
+            if put_code:
+                put_codes.append(str(put_code))
+    if limit is not None:
+        put_codes = put_codes[:limit]
+    return [put_codes[i : i + BULK_WORKS_SIZE] for i in range(0, len(put_codes), BULK_WORKS_SIZE)]
+
+def _format_bulk(bulk_data: dict) -> List[Work]:
+    """
+    Formata a resposta de /works/{put-codes}; itens com "error" são ignorados.
+    """
+    return [
+        _format_work_detail(item["work"])
+        for item in (bulk_data or {}).get("bulk", []) or []
+        if item.get("work")
+    ]
+
+async def format_works_with_contributors_async(orcid_id: str, limit: Optional[int] = None) -> List[Work]:
+    """
+    Busca detalhes completos das obras (até `limit`, ou todas) com coautores,
+    usando o endpoint em lote /works/{put-code,put-code,...} com até
+    BULK_WORKS_CONCURRENCY lotes em paralelo.
+    """
+    summary_data = await fetch_orcid_async(orcid_id, section="works") or {}
+    semaphore = asyncio.Semaphore(BULK_WORKS_CONCURRENCY)
 
+    async def fetch_batch(batch: List[str]) -> List[Work]:
+        async with semaphore:
             try:
-                detail = fetch_orcid(orcid_id, section=f"work/{put_code}")
+                return _format_bulk(await fetch_orcid_async(orcid_id, section=f"works/{','.join(batch)}"))
             except HTTPException:
-                continue
-
-            title = html.unescape(
-                (detail.get("title") or {}).get("title", {}).get("value", "Sem título")
-            )
-            year = (detail.get("publication-date") or {}).get("year", {}).get("value", "----")
-            work_type = detail.get("type") or "desconhecido"
-            container = (detail.get("journal-title") or {}).get("value")
-
-            doi = None
-            for ext in (detail.get("external-ids") or {}).get("external-id", []):
-                if ext.get("external-id-type", "").lower() == "doi":
-                    doi = ext.get("external-id-value")
-                    break
-
-            url = (detail.get("url") or {}).get("value")
-            path = detail.get("path")
-
-            contributors = []
-            for contrib in (detail.get("contributors") or {}).get("contributor", []):
-                credit = contrib.get("credit-name")
-                name = credit.get("value") if isinstance(credit, dict) else None
-                orcid = (contrib.get("contributor-orcid") or {}).get("path")
-                if name:
-                    contributors.append({"name": name, "orcid": orcid})
-
-            works.append({
-                "title":      title,
-                "year":       year,
-                "type":       work_type,
-                "container":  container,
-                "doi":        doi,
-                "url":        url,
-                "path":       path,
-                "coauthors":  contributors
-            })
-
-            count += 1
+                return []
 
-    return works
\ No newline at end of file
+    results = await asyncio.gather(*(fetch_batch(b) for b in _put_code_batches(summary_data, limit)))
+    return [work for formatted in results for work in formatted]
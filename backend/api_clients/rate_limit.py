@@ -0,0 +1,30 @@
+# api_clients/rate_limit.py
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Limitador de taxa por intervalo mínimo entre requisições, para
+    corrotinas no event loop.
+    Ex.: RateLimiter(10) permite no máximo 10 requisições por segundo.
+    """
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second
+        self._next = 0.0
+
+    def _reserve(self) -> float:
+        """
+        Reserva o próximo horário livre e retorna quanto esperar até ele.
+        """
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        return slot - now
+
+    async def wait_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
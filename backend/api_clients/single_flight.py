@@ -0,0 +1,35 @@
+# api_clients/single_flight.py
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes idênticas: enquanto uma requisição com a
+    mesma chave está em andamento no event loop, os demais chamadores
+    esperam por ela e recebem o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        # shield: o cancelamento de um chamador não cancela a requisição dos demais
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Marca a exceção como consumida caso todos os chamadores tenham desistido
+        if not task.cancelled():
+            task.exception()
+
+
+# Instância compartilhada pelos clientes ORCID e OpenAlex
+IN_FLIGHT = SingleFlight()
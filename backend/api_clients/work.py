@@ -0,0 +1,84 @@
+# api_clients/work.py
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# Campos sempre presentes no JSON de uma obra do ORCID
+WORK_KEYS = ("title", "year", "type", "container", "doi", "url", "path")
+
+
+@dataclass(slots=True)
+class Coauthor:
+    name: str
+    orcid: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "orcid": self.orcid}
+
+
+@dataclass(slots=True)
+class Work:
+    """
+    Obra de um autor, compartilhada pelos clientes ORCID/OpenAlex e pelos
+    serviços. Sem __dict__ por instância, ocupa bem menos memória que o dict
+    equivalente; só vira JSON na borda (routers, snapshots, exportação).
+
+    `cited_by_count` e `coauthors` ficam None quando a fonte não os fornece
+    e, nesse caso, não aparecem em to_dict().
+    """
+    title: str
+    year: Union[str, int]
+    type: str = "desconhecido"
+    container: Optional[str] = None
+    doi: Optional[str] = None
+    url: Optional[str] = None
+    path: Optional[str] = None
+    cited_by_count: Optional[int] = None
+    coauthors: Optional[List[Coauthor]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON no formato das obras do ORCID (/works, /with_authors, /dashboard).
+        """
+        data = {key: getattr(self, key) for key in WORK_KEYS}
+        if self.cited_by_count is not None:
+            data["cited_by_count"] = self.cited_by_count
+        if self.coauthors is not None:
+            data["coauthors"] = [c.to_dict() for c in self.coauthors]
+        return data
+
+    def to_openalex_dict(self) -> Dict[str, Any]:
+        """
+        JSON no formato de /works/openalex (citações em "citations").
+        """
+        return {
+            "title":     self.title,
+            "year":      self.year,
+            "doi":       self.doi,
+            "url":       self.url,
+            "type":      self.type,
+            "citations": self.cited_by_count or 0,
+            "coauthors": [c.to_dict() for c in self.coauthors or []]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Work":
+        coauthors = data.get("coauthors")
+        return cls(
+            title=data.get("title", "Sem título"),
+            year=data.get("year", "----"),
+            type=data.get("type") or "desconhecido",
+            container=data.get("container"),
+            doi=data.get("doi"),
+            url=data.get("url"),
+            path=data.get("path"),
+            cited_by_count=data.get("cited_by_count"),
+            coauthors=None if coauthors is None else [Coauthor(**c) for c in coauthors]
+        )
+
+
+def works_to_dicts(works: Iterable[Work]) -> List[Dict[str, Any]]:
+    """
+    Converte obras para JSON (ver Work.to_dict).
+    """
+    return [w.to_dict() for w in works]
@@ -1,13 +1,36 @@
 # app/main.py
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import orcid, filters,  works_publication 
+from api_clients import aio_session
+from app.services.export_jobs import cancel_export_jobs
+from app.services.orcid_service import run_snapshot_refresher
+from app.services.snapshot_store import SNAPSHOTS
+
+from app.routers import orcid, filters,  works_publication, export_jobs
 
 from app.routers.works_publication import works_router, publication_router
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Abre (ou cria) o banco de snapshots
+    await asyncio.to_thread(SNAPSHOTS.open)
+    # Atualiza em segundo plano os snapshots de autores que ficaram antigos
+    refresher = asyncio.create_task(run_snapshot_refresher())
+    yield
+    refresher.cancel()
+    # Interrompe os jobs de exportação em andamento
+    await cancel_export_jobs()
+    # Fecha a sessão aiohttp compartilhada pelos clientes ORCID/OpenAlex
+    await aio_session.close_session()
+    SNAPSHOTS.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Configuração de CORS
 app.add_middleware(
@@ -15,6 +38,8 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Idade dos dados servidos de snapshot (stale-while-revalidate)
+    expose_headers=["Age", "X-Data-Fetched-At", "X-Data-Stale"],
 )
 
 # Routers
@@ -22,6 +47,7 @@ app.include_router(orcid.router, prefix="/orcid", tags=["ORCID"])
 app.include_router(works_router)  # prefix="/orcid/{orcid_id}/works", tags=["Works"]
 app.include_router(filters.router, prefix="/orcid/{orcid_id}/works", tags=["Filters"])
 app.include_router(publication_router)  # prefix="/works/publication", tags=["Publication"]
+app.include_router(export_jobs.router)  # prefix="/export/jobs", tags=["Export"]
 @app.get("/")
 def read_root():
     return {"message": "API FastAPI online no Render!"}
\ No newline at end of file
@@ -0,0 +1,64 @@
+# app/routers/export_jobs.py
+
+import os
+from typing import List, Literal
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+
+from app.services.export_jobs import (
+    EXPORT_JOB_FORMATS,
+    MAX_EXPORT_JOB_AUTHORS,
+    create_export_job,
+    get_export_job,
+)
+from app.utils.utils import normalize_orcid
+
+router = APIRouter(prefix="/export/jobs", tags=["Export"])
+
+
+class ExportJobRequest(BaseModel):
+    orcid_ids: List[str] = Field(..., min_length=1, max_length=MAX_EXPORT_JOB_AUTHORS)
+    formats: List[Literal["xml", "ndjson"]] = Field(default=list(EXPORT_JOB_FORMATS), min_length=1)
+
+
+@router.post("", status_code=202)
+async def start_export_job(body: ExportJobRequest):
+    """
+    Inicia a exportação de vários pesquisadores em segundo plano e retorna
+    o id do job imediatamente. O arquivo .zip traz <orcid>.xml e/ou
+    <orcid>.ndjson por autor, mais um manifest.json com as falhas.
+    """
+    job = await create_export_job([normalize_orcid(oid) for oid in body.orcid_ids], body.formats)
+    return {
+        "job_id":     job.id,
+        "status":     job.status,
+        "status_url": f"/export/jobs/{job.id}",
+    }
+
+
+@router.get("/{job_id}")
+async def export_job_status(job_id: str):
+    """
+    Progresso do job (autores concluídos, falhas) e, ao terminar, o link
+    para download do arquivo.
+    """
+    return get_export_job(job_id).to_dict()
+
+
+@router.get("/{job_id}/download")
+async def download_export_job(job_id: str):
+    """
+    Baixa o .zip de um job concluído. Lança 409 enquanto o job não terminou.
+    """
+    job = get_export_job(job_id)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job de exportação ainda não concluído ({job.status})")
+    if not os.path.exists(job.path):
+        raise HTTPException(status_code=410, detail="Arquivo da exportação não está mais disponível")
+    return FileResponse(
+        job.path,
+        media_type="application/zip",
+        filename=f"export-{job.id}.zip"
+    )
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Query
 from typing import Optional
 
+from api_clients.work import works_to_dicts
 from app.services.orcid_service import (
     filter_works_by_keyword,
     filter_works_by_year,
@@ -11,9 +12,9 @@ from app.utils.utils import normalize_orcid
 router = APIRouter()
 
 @router.get("/filter_by_keyword")
-def by_keyword(
+async def by_keyword(
     orcid_id: str,
-    keyword: str = Query(..., description="Palavra-chave para buscar em títulos, resumos ou keywords"),
+    keyword: str = Query(..., description="Palavra-chave para buscar nos títulos (sem diferenciar acentos)"),
     year: Optional[int] = Query(None, ge=0, description="Ano opcional para pré-filtrar as obras")
 ):
     """
@@ -33,11 +34,13 @@ def by_keyword(
         }
     """
     oid = normalize_orcid(orcid_id)
-    return filter_works_by_keyword(oid, keyword, year)
+    data = await filter_works_by_keyword(oid, keyword, year)
+    data["works"] = works_to_dicts(data["works"])
+    return data
 
 
 @router.get("/filter_by_year")
-def by_year(
+async def by_year(
     orcid_id: str,
     year: int = Query(..., ge=0, description="Ano de publicação para filtrar"),
     keyword: Optional[str] = Query(None, description="Palavra-chave opcional para filtrar após o ano")
@@ -59,11 +62,13 @@ def by_year(
         }
     """
     oid = normalize_orcid(orcid_id)
-    return filter_works_by_year(oid, year, keyword)
+    data = await filter_works_by_year(oid, year, keyword)
+    data["works"] = works_to_dicts(data["works"])
+    return data
 
 
 @router.get("/filter_by_citations")
-def by_citations(
+async def by_citations(
     orcid_id: str,
     year: Optional[int] = Query(None, ge=0, description="Ano opcional para pré-filtrar as obras"),
     keyword: Optional[str] = Query(None, description="Palavra-chave opcional para pré-filtrar as obras")
@@ -85,4 +90,6 @@ def by_citations(
         }
     """
     oid = normalize_orcid(orcid_id)
-    return filter_works_by_citations(oid, year, keyword)
+    data = await filter_works_by_citations(oid, year, keyword)
+    data["works_sorted_by_citations"] = works_to_dicts(data["works_sorted_by_citations"])
+    return data
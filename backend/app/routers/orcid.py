@@ -1,6 +1,9 @@
 # app/routers/orcid.py
 
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 
 from app.services.orcid_service import (
@@ -13,79 +16,90 @@ from app.services.orcid_service import (
     get_all_data,
     get_orcid_metrics,
     get_orcid_stats,
+    get_dashboard,
+    get_bulk_metrics,
+    SWR_MAX_AGE,
 )
-from app.utils.utils import normalize_orcid, xml_response
+from app.services.export_service import EXPORT_FORMATS, export_body
+from app.utils.utils import normalize_orcid, xml_response, set_age_headers
 
 router = APIRouter()
 
+# Limite de autores por requisição de /metrics/bulk
+MAX_BULK_AUTHORS = 1000
+
+
+class BulkMetricsRequest(BaseModel):
+    orcid_ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_AUTHORS)
+
 
 @router.get("/search/name", response_model=List[Dict[str, str]])
-def search_name(query: str, max_results: int = 10):
+async def search_name(query: str, max_results: int = 10):
     """
     Busca autores cujo nome corresponde ao termo e retorna JSON com "orcid" e "full_name".
     """
-    return search_by_name(query, max_results)
+    return await search_by_name(query, max_results)
 
 
 @router.get("/{orcid_id}/name")
-def read_name(orcid_id: str):
+async def read_name(orcid_id: str):
     """
     Retorna o nome formatado completo do autor ORCID.
     """
     oid = normalize_orcid(orcid_id)
-    return get_name(oid)
+    return await get_name(oid)
 
 
 @router.get("/{orcid_id}/keywords")
-def read_keywords(orcid_id: str):
+async def read_keywords(orcid_id: str):
     """
     Retorna as keywords associadas ao autor ORCID.
     """
     oid = normalize_orcid(orcid_id)
-    return get_keywords(oid)
+    return await get_keywords(oid)
 
 
 @router.get("/{orcid_id}/personal")
-def read_personal(orcid_id: str):
+async def read_personal(orcid_id: str):
     """
     Retorna informações pessoais (nome, biografia, e-mails, etc.).
     """
     oid = normalize_orcid(orcid_id)
-    return get_personal(oid)
+    return await get_personal(oid)
 
 
 @router.get("/{orcid_id}/employments")
-def read_employments(orcid_id: str):
+async def read_employments(orcid_id: str):
     """
     Retorna histórico de empregos do autor.
     """
     oid = normalize_orcid(orcid_id)
-    return get_employments(oid)
+    return await get_employments(oid)
 
 
 @router.get("/{orcid_id}/educations")
-def read_educations(orcid_id: str):
+async def read_educations(orcid_id: str):
     """
     Retorna histórico educacional do autor.
     """
     oid = normalize_orcid(orcid_id)
-    return get_educations(oid)
+    return await get_educations(oid)
 
 
 @router.get("/{orcid_id}/all")
-def read_all(orcid_id: str):
+async def read_all(orcid_id: str):
     """
     Monta um JSON unificado com nome, obras, keywords, dados pessoais, empregos e formações.
     """
     oid = normalize_orcid(orcid_id)
-    data = get_all_data(oid)
+    data = await get_all_data(oid)
     if not data:
         raise HTTPException(status_code=404, detail="ORCID não encontrado")
     return data
 
 
 @router.get("/{orcid_id}/metrics")
-def metrics(orcid_id: str):
+async def metrics(orcid_id: str, response: Response):
     """
     Retorna métricas agregadas do autor ORCID, incluindo:
     - total_publicacoes
@@ -97,11 +111,28 @@ def metrics(orcid_id: str):
     - pesquisa_mais_citada
     """
     oid = normalize_orcid(orcid_id)
-    return get_orcid_metrics(oid)
+    data, age = await get_orcid_metrics(oid)
+    set_age_headers(response, age, SWR_MAX_AGE)
+    return data
+
+
+@router.post("/metrics/bulk")
+async def bulk_metrics(body: BulkMetricsRequest):
+    """
+    Calcula as métricas de vários autores de uma vez (ex.: um departamento).
+    A resposta é NDJSON, enviada conforme os autores são processados:
+    {"orcid_id": str, "metrics": {...}}   # mesmo formato de /metrics
+    {"orcid_id": str, "error": str}       # se o ORCID do autor falhar
+    ...
+    {"cohort": {"autores", "falhas", "metrics", "h_index_medio",
+                "h_index_mediano", "h_index_maximo", "stats"}}
+    """
+    oids = [normalize_orcid(oid) for oid in body.orcid_ids]
+    return StreamingResponse(await get_bulk_metrics(oids), media_type="application/x-ndjson")
 
 
 @router.get("/{orcid_id}/stats")
-def stats(orcid_id: str):
+async def stats(orcid_id: str, response: Response):
     """
     Retorna a série temporal para construção de gráfico:
     {
@@ -111,14 +142,62 @@ def stats(orcid_id: str):
     }
     """
     oid = normalize_orcid(orcid_id)
-    return get_orcid_stats(oid)
+    data, age = await get_orcid_stats(oid)
+    set_age_headers(response, age, SWR_MAX_AGE)
+    return data
+
+
+@router.get("/{orcid_id}/dashboard")
+async def dashboard(orcid_id: str, response: Response):
+    """
+    Retorna em uma única chamada os dados do dashboard:
+    {
+      "orcid_id": str,
+      "works": [...],      # obras com cited_by_count
+      "metrics": {...},    # mesmo formato de /metrics
+      "stats": {...}       # mesmo formato de /stats
+    }
+    """
+    oid = normalize_orcid(orcid_id)
+    data, age = await get_dashboard(oid)
+    set_age_headers(response, age, SWR_MAX_AGE)
+    return data
 
 
 @router.get("/{orcid_id}/export/xml")
-def export_researcher_xml(orcid_id: str):
+async def export_researcher_xml(orcid_id: str):
     """
     Exporta todos os dados de um pesquisador para um arquivo XML.
     """
     oid = normalize_orcid(orcid_id)
-    data = get_all_data(oid)
+    data = await get_all_data(oid)
     return xml_response(data, oid)
+
+
+@router.get("/{orcid_id}/export/{fmt}")
+async def export_researcher(orcid_id: str, fmt: str, response: Response):
+    """
+    Exporta as obras do pesquisador, com citações, em formatos para análise:
+    - ndjson: uma obra por linha (enviado em partes)
+    - csv: cabeçalho + uma obra por linha (enviado em partes)
+    - parquet / arrow: arquivo colunar com as métricas nos metadados
+      (requer o pacote opcional pyarrow)
+    Colunas: orcid_id, title, year, type, container, doi, url, path, cited_by_count.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato inválido. Use xml, {', '.join(EXPORT_FORMATS)}"
+        )
+    oid = normalize_orcid(orcid_id)
+    data, age = await get_dashboard(oid)
+    # Parquet/Arrow montam e serializam a tabela inteira: fora do event loop
+    body = await asyncio.to_thread(export_body, oid, fmt, data["works"], data["metrics"])
+    media_type, ext = EXPORT_FORMATS[fmt]
+    streaming = StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{oid}.{ext}"'}
+    )
+    set_age_headers(streaming, age, SWR_MAX_AGE)
+    return streaming
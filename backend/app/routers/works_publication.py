@@ -1,15 +1,26 @@
 # app/routers/works_publication.py
 
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Literal, Optional
 
 from app.services.orcid_service import (
     get_works,
     get_works_with_authors,
     get_works_openalex,
+    query_works,
+    QUERY_DEFAULT_LIMIT,
+    QUERY_MAX_LIMIT,
+    SWR_MAX_AGE,
 )
-from app.services.openalex_service import get_publication_details, get_works_from_openalex
-from app.utils.utils import normalize_orcid, normalize_doi
+from app.services.openalex_service import (
+    get_publication_details,
+    get_publications_details,
+    get_works_from_openalex,
+)
+from api_clients.work import works_to_dicts
+from app.utils.utils import normalize_orcid, normalize_doi, set_age_headers
 
 # Router para endpoints de obras via ORCID
 works_router = APIRouter(
@@ -19,7 +30,7 @@ works_router = APIRouter(
 )
 
 @works_router.get("/")
-def list_works(orcid_id: str):
+async def list_works(orcid_id: str, response: Response):
     """
     Retorna todas as obras de um autor ORCID, incluindo contagem de citações.
 
@@ -33,11 +44,50 @@ def list_works(orcid_id: str):
         }
     """
     oid = normalize_orcid(orcid_id)
-    return get_works(oid)
+    data, age = await get_works(oid)
+    set_age_headers(response, age, SWR_MAX_AGE)
+    return data
+
+
+@works_router.get("/query")
+async def query_author_works(
+    orcid_id: str,
+    year_from: Optional[int] = Query(None, ge=0, description="Ano inicial (inclusivo)"),
+    year_to: Optional[int] = Query(None, ge=0, description="Ano final (inclusivo)"),
+    keyword: Optional[str] = Query(None, description="Palavra-chave buscada nos títulos (sem diferenciar acentos)"),
+    work_type: Optional[str] = Query(None, alias="type", description="Tipo da obra, ex.: journal-article"),
+    min_citations: Optional[int] = Query(None, ge=0, description="Número mínimo de citações"),
+    sort: Literal["year", "-year", "citations", "-citations", "title", "-title"] = Query(
+        "-year", description="Chave de ordenação; prefixo '-' para ordem decrescente"
+    ),
+    limit: int = Query(QUERY_DEFAULT_LIMIT, ge=1, le=QUERY_MAX_LIMIT, description="Obras por página"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior")
+):
+    """
+    Consulta as obras de um autor combinando filtros, com ordenação e
+    paginação por cursor. Substitui o uso combinado dos três filtros.
+
+    Args:
+        orcid_id (str): Identificador ORCID do autor.
+
+    Returns:
+        dict: {
+            "orcid_id": str,
+            "total": int,                  # obras que atendem aos filtros
+            "works": List[Dict[str, Any]], # página atual, com cited_by_count
+            "next_cursor": Optional[str]   # None na última página
+        }
+    """
+    oid = normalize_orcid(orcid_id)
+    data = await query_works(
+        oid, year_from, year_to, keyword, work_type, min_citations, sort, limit, cursor
+    )
+    data["works"] = works_to_dicts(data["works"])
+    return data
 
 
 @works_router.get("/with_authors")
-def list_works_with_authors(orcid_id: str):
+async def list_works_with_authors(orcid_id: str):
     """
     Retorna todas as obras de um autor, com lista de coautores.
 
@@ -50,13 +100,15 @@ def list_works_with_authors(orcid_id: str):
         }
     """
     oid = normalize_orcid(orcid_id)
-    return get_works_with_authors(oid)
+    data = await get_works_with_authors(oid)
+    return {"works": works_to_dicts(data["works"])}
 
 
 @works_router.get("/openalex")
-def list_works_openalex(orcid_id: str):
+async def list_works_openalex(orcid_id: str):
     """
     Recupera publicações de um autor via OpenAlex, incluindo coautores e citações.
+    A resposta é enviada em partes, conforme as páginas do OpenAlex chegam.
 
     Args:
         orcid_id (str): Identificador ORCID do autor.
@@ -67,7 +119,7 @@ def list_works_openalex(orcid_id: str):
         }
     """
     oid = normalize_orcid(orcid_id)
-    return get_works_openalex(oid)
+    return StreamingResponse(await get_works_openalex(oid), media_type="application/json")
 
 
 # Router para endpoint de detalhes de publicação via DOI
@@ -80,8 +132,37 @@ publication_router = APIRouter(
     }
 )
 
+# Limite de DOIs por requisição de /works/publication/batch
+MAX_BATCH_DOIS = 300
+
+
+class PublicationBatchRequest(BaseModel):
+    dois: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_DOIS)
+
+
+@publication_router.post("/batch", response_model=List[Dict[str, Any]])
+async def get_publications_batch(body: PublicationBatchRequest):
+    """
+    Retorna detalhes de várias publicações de uma vez, a partir dos DOIs.
+
+    Args:
+        body (PublicationBatchRequest): {"dois": List[str]} com até MAX_BATCH_DOIS DOIs.
+
+    Returns:
+        List[Dict[str, Any]]: um item por DOI, na ordem enviada, no mesmo formato
+        de GET /works/publication/{doi}; DOIs não encontrados vêm como
+        {"doi": str, "error": str}.
+
+    Raises:
+        HTTPException:
+            - 422 se a lista estiver vazia ou exceder MAX_BATCH_DOIS,
+            - 502 em caso de falha de conexão ou erro externo.
+    """
+    return await get_publications_details(body.dois)
+
+
 @publication_router.get("/{doi:path}", response_model=Dict[str, Any])
-def get_publication(doi: str):
+async def get_publication(doi: str):
     """
     Retorna detalhes de uma publicação a partir do DOI,
     combinando dados do OpenAlex e, se disponível, do ORCID.
@@ -108,6 +189,6 @@ def get_publication(doi: str):
     """
     d_norm = normalize_doi(doi)
     try:
-        return get_publication_details(d_norm)
+        return await get_publication_details(d_norm)
     except HTTPException as e:
         raise e
@@ -0,0 +1,254 @@
+# app/services/export_jobs.py
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from fastapi import HTTPException
+
+from app.services.export_service import iter_ndjson
+from app.services.orcid_service import get_all_data, get_dashboard
+from app.utils.utils import iter_pretty_xml
+
+logger = logging.getLogger(__name__)
+
+# Diretório local onde os arquivos .zip das exportações são gravados
+EXPORT_JOBS_DIR = os.environ.get("EXPORT_JOBS_DIR", "exports")
+# Autores exportados em paralelo, somando todos os jobs
+EXPORT_JOB_CONCURRENCY = 4
+# Limites por job e de jobs mantidos em memória
+MAX_EXPORT_JOB_AUTHORS = 500
+MAX_EXPORT_JOBS = 200
+# Jobs concluídos (e seus arquivos) são removidos após este tempo
+EXPORT_JOB_TTL = 24 * 60 * 60
+EXPORT_JOB_FORMATS = ("xml", "ndjson")
+
+_SEMAPHORE = asyncio.Semaphore(EXPORT_JOB_CONCURRENCY)
+_JOB_TASKS: Set[asyncio.Task] = set()
+
+
+class ExportJob:
+    """
+    Exportação de vários autores para um arquivo .zip, executada em segundo
+    plano. O arquivo é escrito como <id>.zip.part e renomeado ao terminar.
+    """
+    __slots__ = (
+        "id", "orcid_ids", "formats", "status", "completed", "errors",
+        "created_at", "finished_at", "path"
+    )
+
+    def __init__(self, orcid_ids: List[str], formats: List[str]):
+        self.id = uuid.uuid4().hex
+        self.orcid_ids = orcid_ids
+        self.formats = formats
+        self.status = "pending"
+        self.completed = 0
+        self.errors: Dict[str, str] = {}
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.path = os.path.join(EXPORT_JOBS_DIR, f"{self.id}.zip")
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = len(self.orcid_ids)
+        return {
+            "job_id":       self.id,
+            "status":       self.status,
+            "formats":      self.formats,
+            "total":        total,
+            "completed":    self.completed,
+            "failed":       len(self.errors),
+            "progress":     round(self.completed / total, 4) if total else 1.0,
+            "errors":       self.errors,
+            "created_at":   self.created_at,
+            "finished_at":  self.finished_at,
+            "download_url": f"/export/jobs/{self.id}/download" if self.status == "done" else None,
+        }
+
+
+# Jobs conhecidos por este processo (ver _sweep_jobs)
+JOBS: "OrderedDict[str, ExportJob]" = OrderedDict()
+
+
+class _ZipWriter:
+    """
+    Arquivo .zip de um job. ZipFile não aceita escritas concorrentes: as
+    entradas são gravadas uma por vez (em threads), e depois de close()
+    escritas que ainda estavam na fila são descartadas.
+    """
+    __slots__ = ("zf", "lock", "closed")
+
+    def __init__(self, path: str):
+        self.zf = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def write(self, name: str, chunks: Iterable[bytes]) -> None:
+        with self.lock:
+            if self.closed:
+                return
+            with self.zf.open(name, "w") as dest:
+                for chunk in chunks:
+                    dest.write(chunk)
+
+    def close(self) -> None:
+        with self.lock:
+            if not self.closed:
+                self.closed = True
+                self.zf.close()
+
+
+async def _export_author(job: ExportJob, oid: str, writer: _ZipWriter) -> None:
+    async with _SEMAPHORE:
+        try:
+            if "xml" in job.formats:
+                data = await get_all_data(oid)
+                if not data:
+                    raise HTTPException(status_code=404, detail="ORCID não encontrado")
+                chunks = iter_pretty_xml(data, "researcher", {"orcid": oid})
+                await asyncio.to_thread(writer.write, f"{oid}.xml", chunks)
+            if "ndjson" in job.formats:
+                dashboard, _ = await get_dashboard(oid)
+                chunks = iter_ndjson(oid, dashboard["works"])
+                await asyncio.to_thread(writer.write, f"{oid}.ndjson", chunks)
+        except HTTPException as e:
+            job.errors[oid] = str(e.detail)
+        except Exception as e:
+            logger.exception("Erro ao exportar %s no job %s", oid, job.id)
+            job.errors[oid] = f"Erro interno: {e}"
+        job.completed += 1
+
+
+async def _run_job(job: ExportJob) -> None:
+    job.status = "running"
+    part = job.path + ".part"
+    writer: Optional[_ZipWriter] = None
+    try:
+        writer = await asyncio.to_thread(_ZipWriter, part)
+        await asyncio.gather(*(_export_author(job, oid, writer) for oid in job.orcid_ids))
+        manifest = {
+            "job_id":     job.id,
+            "formats":    job.formats,
+            "orcid_ids":  job.orcid_ids,
+            "errors":     job.errors,
+            "created_at": job.created_at,
+        }
+        await asyncio.to_thread(
+            writer.write, "manifest.json",
+            [json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")]
+        )
+        await asyncio.to_thread(writer.close)
+        await asyncio.to_thread(os.replace, part, job.path)
+        job.status = "done"
+    except (Exception, asyncio.CancelledError) as e:
+        if not isinstance(e, asyncio.CancelledError):
+            logger.exception("Falha no job de exportação %s", job.id)
+        job.status = "failed"
+        if writer is not None:
+            # Espera a escrita em andamento terminar antes de fechar e apagar
+            await asyncio.to_thread(writer.close)
+        await asyncio.to_thread(_remove_file, part)
+        if isinstance(e, asyncio.CancelledError):
+            raise
+    finally:
+        job.finished_at = time.time()
+
+
+def _remove_file(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _sweep_files(paths: List[str], known: Set[str], cutoff: float) -> None:
+    """
+    Apaga os arquivos dos jobs descartados e os arquivos anteriores a
+    `cutoff` que não pertencem a jobs conhecidos (deixados por execuções
+    anteriores da aplicação). Faz E/S de disco: roda fora do event loop.
+    """
+    os.makedirs(EXPORT_JOBS_DIR, exist_ok=True)
+    for path in paths:
+        _remove_file(path)
+    with os.scandir(EXPORT_JOBS_DIR) as entries:
+        for entry in entries:
+            job_id = entry.name.split(".", 1)[0]
+            if job_id not in known and entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+
+
+async def _sweep_jobs() -> None:
+    """
+    Remove os jobs concluídos há mais de EXPORT_JOB_TTL, com seus arquivos,
+    e arquivos antigos deixados por execuções anteriores da aplicação. Se
+    ainda houver MAX_EXPORT_JOBS jobs ou mais, descarta os concluídos mais
+    antigos; jobs em andamento nunca são descartados.
+    """
+    cutoff = time.time() - EXPORT_JOB_TTL
+    removed = [
+        job for job in JOBS.values()
+        if job.finished_at is not None and job.finished_at < cutoff
+    ]
+    # Abre espaço para o próximo job
+    finished = [
+        job for job in JOBS.values()
+        if job.finished_at is not None and job.finished_at >= cutoff
+    ]
+    removed += finished[:max(0, len(JOBS) - len(removed) - MAX_EXPORT_JOBS + 1)]
+    for job in removed:
+        JOBS.pop(job.id, None)
+    await asyncio.to_thread(_sweep_files, [job.path for job in removed], set(JOBS), cutoff)
+
+
+async def create_export_job(orcid_ids: List[str], formats: List[str]) -> ExportJob:
+    """
+    Registra um job de exportação para os autores (sem repetição) e o
+    inicia em segundo plano; retorna imediatamente.
+
+    Raises:
+        HTTPException: 400 para formato desconhecido; 429 se já houver
+        MAX_EXPORT_JOBS jobs em andamento.
+    """
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_JOB_FORMATS]
+    if unknown or not formats:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formatos válidos: {', '.join(EXPORT_JOB_FORMATS)}"
+        )
+    await _sweep_jobs()
+    if len(JOBS) >= MAX_EXPORT_JOBS:
+        raise HTTPException(status_code=429, detail="Muitos jobs de exportação em andamento")
+    job = ExportJob(list(dict.fromkeys(orcid_ids)), list(dict.fromkeys(formats)))
+    JOBS[job.id] = job
+
+    task = asyncio.create_task(_run_job(job))
+    # Mantém referência até o fim para a task não ser coletada
+    _JOB_TASKS.add(task)
+    task.add_done_callback(_JOB_TASKS.discard)
+    return job
+
+
+def get_export_job(job_id: str) -> ExportJob:
+    """
+    Raises:
+        HTTPException: 404 se o job não existir.
+    """
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job de exportação não encontrado")
+    return job
+
+
+async def cancel_export_jobs() -> None:
+    """
+    Cancela os jobs em andamento (ex.: no encerramento da aplicação) e
+    espera cada um fechar e apagar seu arquivo parcial.
+    """
+    tasks = list(_JOB_TASKS)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,145 @@
+# app/services/export_service.py
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+from fastapi import HTTPException
+
+# Só os formatos parquet/arrow dependem do pyarrow; sem ele, respondem 501
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Colunas de cada obra nos formatos tabulares
+WORK_COLUMNS = ("orcid_id", "title", "year", "type", "container", "doi", "url", "path", "cited_by_count")
+
+# Formato → (media type, extensão do arquivo)
+EXPORT_FORMATS = {
+    "ndjson":  ("application/x-ndjson", "ndjson"),
+    "csv":     ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow":   ("application/vnd.apache.arrow.file", "arrow"),
+}
+
+# Linhas por parte nas exportações em texto
+EXPORT_CHUNK_ROWS = 500
+
+
+def _rows(orcid_id: str, works: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for w in works:
+        row = {"orcid_id": orcid_id}
+        row.update((col, w.get(col)) for col in WORK_COLUMNS[1:])
+        yield row
+
+
+def iter_ndjson(orcid_id: str, works: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Uma linha JSON por obra, com as colunas de WORK_COLUMNS.
+    """
+    lines: List[str] = []
+    for row in _rows(orcid_id, works):
+        lines.append(json.dumps(row, ensure_ascii=False))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def iter_csv(orcid_id: str, works: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    CSV com cabeçalho e uma linha por obra (colunas de WORK_COLUMNS).
+    """
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=WORK_COLUMNS)
+    writer.writeheader()
+    for n, row in enumerate(_rows(orcid_id, works), 1):
+        writer.writerow(row)
+        if n % EXPORT_CHUNK_ROWS == 0:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate()
+    yield out.getvalue().encode("utf-8")
+
+
+def _year(value: Any) -> Optional[int]:
+    if isinstance(value, int):
+        return value or None
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def works_table(orcid_id: str, works: List[Dict[str, Any]], metrics: Optional[Dict[str, Any]] = None):
+    """
+    Tabela Arrow das obras (uma coluna por campo de WORK_COLUMNS, com o ano
+    como inteiro) e as métricas do autor nos metadados do schema ("metrics").
+    """
+    schema = pa.schema(
+        [
+            ("orcid_id",       pa.string()),
+            ("title",          pa.string()),
+            ("year",           pa.int32()),
+            ("type",           pa.string()),
+            ("container",      pa.string()),
+            ("doi",            pa.string()),
+            ("url",            pa.string()),
+            ("path",           pa.string()),
+            ("cited_by_count", pa.int64()),
+        ],
+        metadata={"metrics": json.dumps(metrics or {}, ensure_ascii=False)}
+    )
+    columns = {
+        col: [w.get(col) for w in works]
+        for col in WORK_COLUMNS[1:]
+    }
+    columns["orcid_id"] = [orcid_id] * len(works)
+    columns["year"] = [_year(y) for y in columns["year"]]
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def table_bytes(table, fmt: str) -> bytes:
+    """
+    Serializa a tabela como Parquet (compressão zstd) ou Arrow IPC (arquivo).
+    """
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        pq.write_table(table, sink, compression="zstd")
+    else:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def export_body(
+    orcid_id: str,
+    fmt: str,
+    works: List[Dict[str, Any]],
+    metrics: Optional[Dict[str, Any]] = None
+) -> Iterator[bytes]:
+    """
+    Corpo da exportação no formato `fmt` (chave de EXPORT_FORMATS).
+    NDJSON e CSV são gerados em partes; Parquet/Arrow exigem o arquivo
+    completo (o rodapé depende de todas as colunas) e saem em uma parte.
+
+    Raises:
+        HTTPException: 400 para formato desconhecido; 501 se o formato
+        depende do pyarrow e ele não está instalado.
+    """
+    if fmt == "ndjson":
+        return iter_ndjson(orcid_id, works)
+    if fmt == "csv":
+        return iter_csv(orcid_id, works)
+    if fmt in ("parquet", "arrow"):
+        if pa is None:
+            raise HTTPException(
+                status_code=501,
+                detail=f"Exportação em {fmt} requer o pacote opcional pyarrow"
+            )
+        return iter([table_bytes(works_table(orcid_id, works, metrics), fmt)])
+    raise HTTPException(status_code=400, detail=f"Formato de exportação desconhecido: {fmt}")
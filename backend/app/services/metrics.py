@@ -0,0 +1,191 @@
+# app/services/metrics.py
+
+import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Janela padrão (em anos) do fator de impacto: obras de current_year - 2 em diante
+IMPACT_WINDOW = 2
+# Limiar de citações do índice i10
+I10_THRESHOLD = 10
+
+
+class WorkArrays:
+    """
+    Obras de um ou mais autores em arrays contíguos: ano e citações de cada
+    obra, com as obras do autor i em [offsets[i], offsets[i + 1]).
+    """
+    __slots__ = ("years", "citations", "offsets")
+
+    def __init__(self, years: np.ndarray, citations: np.ndarray, offsets: np.ndarray):
+        self.years = np.asarray(years, dtype=np.int32)
+        self.citations = np.asarray(citations, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+    @classmethod
+    def from_authors(cls, authors: Sequence[Tuple[Sequence[int], Sequence[int]]]) -> "WorkArrays":
+        """
+        Monta os arrays a partir de uma sequência de (anos, citações) por autor.
+        """
+        sizes = [len(years) for years, _ in authors]
+        offsets = np.zeros(len(authors) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        years = np.concatenate([np.asarray(y, dtype=np.int32) for y, _ in authors]) if authors else []
+        cites = np.concatenate([np.asarray(c, dtype=np.int64) for _, c in authors]) if authors else []
+        return cls(years, cites, offsets)
+
+    @property
+    def n_authors(self) -> int:
+        return len(self.offsets) - 1
+
+    def owners(self) -> np.ndarray:
+        """
+        Índice do autor de cada obra.
+        """
+        return np.repeat(np.arange(self.n_authors), np.diff(self.offsets))
+
+
+def work_arrays(
+    ids: Dict[str, int],
+    no_id_years: List[int],
+    citations: Dict[str, int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converte os IDs/anos de ParsedWorks (ids, no_id_years) e as citações em arrays (anos, citações),
+    uma posição por obra; obras sem ID contam com 0 citações.
+    """
+    n = len(ids) + len(no_id_years)
+    years = np.fromiter(ids.values(), dtype=np.int32, count=len(ids))
+    cites = np.fromiter((citations.get(key, 0) for key in ids), dtype=np.int64, count=len(ids))
+    years = np.concatenate([years, np.asarray(no_id_years, dtype=np.int32)])
+    cites = np.concatenate([cites, np.zeros(n - len(ids), dtype=np.int64)])
+    return years, cites
+
+
+def yearly_series(years: np.ndarray, citations: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Agrupa obras por ano. Retorna (anos, publicações, citações), ordenados por ano.
+    """
+    uniq, inverse = np.unique(years, return_inverse=True)
+    pubs = np.bincount(inverse, minlength=len(uniq))
+    cites = np.bincount(inverse, weights=citations, minlength=len(uniq)).astype(np.int64)
+    return uniq, pubs, cites
+
+
+def yearly_series_batch(arrays: WorkArrays) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Séries anuais de vários autores de uma vez. Retorna (anos, publicações,
+    citações), onde publicações e citações são matrizes autores × anos.
+    """
+    uniq, inverse = np.unique(arrays.years, return_inverse=True)
+    shape = (arrays.n_authors, len(uniq))
+    cell = arrays.owners() * len(uniq) + inverse
+    size = shape[0] * shape[1]
+    pubs = np.bincount(cell, minlength=size).reshape(shape)
+    cites = np.bincount(cell, weights=arrays.citations, minlength=size).astype(np.int64).reshape(shape)
+    return uniq, pubs, cites
+
+
+def _safe_div(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    return np.divide(num, den, out=np.zeros(len(num), dtype=np.float64), where=den > 0)
+
+
+def batch_metrics(
+    arrays: WorkArrays,
+    current_year: Optional[int] = None,
+    windows: Sequence[int] = (IMPACT_WINDOW,)
+) -> Dict[str, np.ndarray]:
+    """
+    Calcula as métricas de todos os autores de uma vez, sem laços em Python
+    por obra. Retorna um array (um valor por autor) para cada métrica:
+    total_publicacoes, total_citacoes, media_citacoes, h_index, i10_index,
+    g_index, m_quotient, pesquisa_mais_citada e fator_de_impacto_{w}a para
+    cada janela w (citações / publicações de current_year - w em diante).
+    """
+    current_year = current_year or datetime.date.today().year
+    n = arrays.n_authors
+    years, cites = arrays.years, arrays.citations
+    owners = arrays.owners()
+
+    total_pubs = np.diff(arrays.offsets)
+    total_cites = np.bincount(owners, weights=cites, minlength=n).astype(np.int64)
+
+    # Ordena as citações de cada autor em ordem decrescente e numera as obras
+    # (1, 2, ...) dentro de cada autor
+    order = np.lexsort((-cites, owners))
+    sorted_cites = cites[order]
+    sorted_owners = owners[order]
+    rank = np.arange(1, len(order) + 1) - arrays.offsets[sorted_owners]
+
+    # h: maior h com h obras de >= h citações; como as citações decrescem e o
+    # rank cresce, basta contar as posições que satisfazem a condição
+    h = np.bincount(sorted_owners, weights=sorted_cites >= rank, minlength=n).astype(np.int64)
+
+    # g: maior g cujas g obras mais citadas somam >= g² citações
+    cum = np.cumsum(sorted_cites)
+    before = np.concatenate(([0], cum))[arrays.offsets[:-1]]
+    cum_in_author = cum - before[sorted_owners]
+    g = np.bincount(sorted_owners, weights=cum_in_author >= rank * rank, minlength=n).astype(np.int64)
+
+    i10 = np.bincount(owners, weights=cites >= I10_THRESHOLD, minlength=n).astype(np.int64)
+
+    most_cited = np.zeros(n, dtype=np.int64)
+    np.maximum.at(most_cited, owners, cites)
+
+    # m: h dividido pelos anos de carreira desde a primeira publicação
+    first_year = np.full(n, current_year, dtype=np.int64)
+    np.minimum.at(first_year, owners, years)
+    career = np.maximum(current_year - first_year + 1, 1)
+
+    result = {
+        "total_publicacoes":    total_pubs,
+        "total_citacoes":       total_cites,
+        "media_citacoes":       _safe_div(total_cites, total_pubs),
+        "h_index":              h,
+        "i10_index":            i10,
+        "g_index":              g,
+        "m_quotient":           np.where(total_pubs > 0, h / career, 0.0),
+        "pesquisa_mais_citada": most_cited,
+    }
+    for w in windows:
+        recent = years >= current_year - w
+        recent_pubs = np.bincount(owners, weights=recent, minlength=n)
+        recent_cites = np.bincount(owners, weights=np.where(recent, cites, 0), minlength=n)
+        result[f"fator_de_impacto_{w}a"] = _safe_div(recent_cites, recent_pubs)
+    return result
+
+
+def metrics_rows(metrics: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Converte o resultado de batch_metrics em um dict por autor, com tipos
+    nativos do Python e médias arredondadas em duas casas.
+    """
+    names = list(metrics)
+    columns = [
+        np.round(metrics[name], 2).tolist() if metrics[name].dtype.kind == "f" else metrics[name].tolist()
+        for name in names
+    ]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def authors_metrics(arrays: WorkArrays, current_year: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Métricas de cada autor de `arrays`, no formato de author_metrics
+    (fator_de_impacto corresponde à janela IMPACT_WINDOW).
+    """
+    rows = metrics_rows(batch_metrics(arrays, current_year))
+    for row in rows:
+        row["fator_de_impacto"] = row.pop(f"fator_de_impacto_{IMPACT_WINDOW}a")
+    return rows
+
+
+def author_metrics(
+    years: np.ndarray,
+    citations: np.ndarray,
+    current_year: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Métricas de um único autor (ver authors_metrics).
+    """
+    return authors_metrics(WorkArrays(years, citations, [0, len(years)]), current_year)[0]
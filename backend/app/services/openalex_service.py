@@ -1,15 +1,25 @@
 # app/services/openalex_service.py
 
-from typing import Dict, Any, Optional
-import requests
+import asyncio
+from typing import Dict, Any, List, Optional
+
+import aiohttp
 from fastapi import HTTPException
 
-from api_clients.openalex_client import format_works_from_openalex
-from api_clients.orcid_client import fetch_orcid, format_works as format_orcid_works
+from api_clients import aio_session
+from api_clients.openalex_client import (
+    fetch_works_by_doi_async,
+    format_works_from_openalex_async,
+    select_param,
+    OA_MAILTO,
+    PUBLICATION_FIELDS,
+)
+from api_clients.work import Work
+from app.services.works_index import get_works_index
 from app.utils.utils import normalize_doi, normalize_orcid
 
 
-def get_publication_details(doi: str) -> Dict[str, Any]:
+async def get_publication_details(doi: str) -> Dict[str, Any]:
     """
     Retorna detalhes de uma publicação a partir do DOI, combinando dados do OpenAlex
     e, se disponível, informações adicionais do autor no ORCID.
@@ -42,19 +52,35 @@ def get_publication_details(doi: str) -> Dict[str, Any]:
     # Consulta o OpenAlex
     oa_url = f"https://api.openalex.org/works/{key}"
     try:
-        resp = requests.get(oa_url, timeout=10)
-    except Exception as e:
+        resp = await aio_session.get(
+            oa_url,
+            params={"select": select_param(PUBLICATION_FIELDS), "mailto": OA_MAILTO},
+            timeout=10
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         raise HTTPException(status_code=502, detail=f"Erro ao conectar ao OpenAlex: {e}")
 
-    if resp.status_code == 404:
+    if resp.status == 404:
         raise HTTPException(status_code=404, detail="Obra não encontrada no OpenAlex para esse DOI")
-    if resp.status_code != 200:
-        raise HTTPException(status_code=resp.status_code, detail="Erro ao buscar obra no OpenAlex")
+    if resp.status != 200:
+        raise HTTPException(status_code=resp.status, detail="Erro ao buscar obra no OpenAlex")
 
     work_oa = resp.json()
 
-    # Extrai o primeiro ORCID de autoria, se existir
-    first_orcid_url: Optional[str] = next(
+    orcid_rec: Optional[Work] = None
+    first_orcid_url = _first_orcid(work_oa)
+    if first_orcid_url:
+        index = await _orcid_doi_index(normalize_orcid(first_orcid_url))
+        orcid_rec = index.get(d_norm)
+
+    return _format_publication(d_norm, work_oa, orcid_rec)
+
+
+def _first_orcid(work_oa: Dict[str, Any]) -> Optional[str]:
+    """
+    Extrai o primeiro ORCID de autoria de uma obra do OpenAlex, se existir.
+    """
+    return next(
         (
             a["author"]["orcid"]
             for a in work_oa.get("authorships", [])
@@ -63,19 +89,24 @@ def get_publication_details(doi: str) -> Dict[str, Any]:
         None
     )
 
-    orcid_rec: Optional[Dict[str, Any]] = None
-    if first_orcid_url:
-        oid = normalize_orcid(first_orcid_url)
-        raw = fetch_orcid(oid, section="works") or {}
-        formatted = format_orcid_works(raw) or []
-        # Busca a obra correspondente no registro ORCID
-        for w in formatted:
-            if w.get("doi") and normalize_doi(w["doi"]) == d_norm:
-                orcid_rec = w.copy()
-                orcid_rec["orcid_id"] = oid
-                break
-
-    # Monta o resultado base usando dados do OpenAlex
+
+async def _orcid_doi_index(oid: str) -> Dict[str, Work]:
+    """
+    Índice DOI → obra do autor, construído uma vez por versão do documento
+    de obras e guardado junto a ele no cache do ORCID (ver WorksIndex).
+    """
+    return (await get_works_index(oid)).by_doi
+
+
+def _format_publication(
+    d_norm: str,
+    work_oa: Dict[str, Any],
+    orcid_rec: Optional[Work] = None
+) -> Dict[str, Any]:
+    """
+    Monta o resultado a partir dos dados do OpenAlex e, se houver,
+    complementa com o registro da obra no ORCID.
+    """
     result: Dict[str, Any] = {
         "doi":              d_norm,
         "id":               work_oa.get("id"),
@@ -95,11 +126,12 @@ def get_publication_details(doi: str) -> Dict[str, Any]:
     # Se houver registro ORCID, adiciona campos extras
     if orcid_rec:
         for fld in ("container", "url", "path"):
-            if orcid_rec.get(fld) and fld not in result:
-                result[fld] = orcid_rec[fld]
+            value = getattr(orcid_rec, fld)
+            if value and fld not in result:
+                result[fld] = value
 
         # Ajusta ano se houver divergência
-        yr = orcid_rec.get("year")
+        yr = orcid_rec.year
         try:
             yr_int = int(yr)  # type: ignore
         except Exception:
@@ -110,7 +142,68 @@ def get_publication_details(doi: str) -> Dict[str, Any]:
     return result
 
 
-def get_works_from_openalex(orcid_id: str) -> Dict[str, Any]:
+async def get_publications_details(dois: List[str]) -> List[Dict[str, Any]]:
+    """
+    Versão em lote de get_publication_details.
+
+    Os DOIs (normalizados e sem repetição) são resolvidos no OpenAlex pelo
+    filtro doi:a|b|c, em poucas requisições. O enriquecimento via ORCID é
+    agrupado por autor: as obras de cada primeiro autor são buscadas uma
+    única vez, mesmo que ele apareça em várias publicações do lote.
+
+    Args:
+        dois (List[str]): DOIs das publicações (com ou sem prefixo URL ou "doi:").
+
+    Returns:
+        List[Dict[str, Any]]: um item por DOI, na ordem do pedido, no mesmo
+        formato de get_publication_details; DOIs não encontrados no OpenAlex
+        vêm como {"doi": str, "error": str}.
+
+    Raises:
+        HTTPException:
+            - 502: falha ao consultar o OpenAlex
+    """
+    normalized = [normalize_doi(d) for d in dois]
+    # "|" é o separador do filtro do OpenAlex: DOIs que o contêm não podem ser consultados
+    unique = list(dict.fromkeys(d for d in normalized if d and "|" not in d))
+
+    items = await fetch_works_by_doi_async(unique) if unique else []
+    by_doi = {
+        normalize_doi(item["doi"]): item
+        for item in items
+        if item.get("doi")
+    }
+
+    # Agrupa por primeiro autor: uma busca de obras no ORCID por autor
+    author_of = {
+        d: normalize_orcid(url)
+        for d, item in by_doi.items()
+        if (url := _first_orcid(item))
+    }
+    oids = list(dict.fromkeys(author_of.values()))
+    indexes = await asyncio.gather(
+        *(_orcid_doi_index(oid) for oid in oids),
+        return_exceptions=True
+    )
+    doi_indexes = {
+        oid: index
+        for oid, index in zip(oids, indexes)
+        if not isinstance(index, Exception)
+    }
+
+    results: List[Dict[str, Any]] = []
+    for d_norm in normalized:
+        work_oa = by_doi.get(d_norm)
+        if work_oa is None:
+            results.append({"doi": d_norm, "error": "Obra não encontrada no OpenAlex para esse DOI"})
+            continue
+        oid = author_of.get(d_norm)
+        orcid_rec = doi_indexes.get(oid, {}).get(d_norm) if oid else None
+        results.append(_format_publication(d_norm, work_oa, orcid_rec))
+    return results
+
+
+async def get_works_from_openalex(orcid_id: str) -> Dict[str, Any]:
     """
     Retorna lista de obras de um autor ORCID consultando o OpenAlex.
 
@@ -118,14 +211,14 @@ def get_works_from_openalex(orcid_id: str) -> Dict[str, Any]:
         orcid_id (str): Identificador ORCID do autor.
 
     Returns:
-        Dict[str, Any]: {"works": List[Dict[str, Any]]}
+        Dict[str, Any]: {"works": List[Work]}
 
     Raises:
         HTTPException:
             - 500: falha genérica ao obter obras do OpenAlex
     """
     try:
-        works = format_works_from_openalex(orcid_id)
+        works = await format_works_from_openalex_async(orcid_id)
         return {"works": works}
     except HTTPException:
         # Repassa erros HTTP conhecidos
@@ -1,33 +1,52 @@
 # app/services/orcid_service.py
 
-from typing import List, Dict, Any, Optional, Set
+import asyncio
+import base64
+import json
+import logging
+import os
+from dataclasses import replace
+from typing import AsyncIterator, List, Dict, Any, Optional, Set, Tuple
+import numpy as np
 from fastapi import HTTPException
 
 from api_clients.orcid_client import (
-    fetch_orcid,
-    search_orcid_by_name,
+    fetch_orcid_async,
+    split_record_sections,
+    search_orcid_by_name_async,
     format_name,
     format_keywords,
     format_personal,
     format_employment,
     format_education_and_qualifications,
     format_works as format_orcid_works,
-    format_works_with_contributors
+    format_works_with_contributors_async
 )
 from api_clients.openalex_client import (
-    fetch_citations,
-    parse_orcid_data,
-    count_by_year,
-    compute_metrics
+    fetch_citations_async,
+    aiter_works_openalex,
+    format_work_with_coauthors,
+    WORK_FIELDS
 )
-from app.utils.utils import (
-    normalize_doi,
-    filter_by_year,
-    filter_by_keyword
+from app.services.metrics import WorkArrays, author_metrics, authors_metrics, work_arrays, yearly_series
+from api_clients.single_flight import IN_FLIGHT
+from api_clients.work import Work, works_to_dicts
+from app.services.snapshot_store import SNAPSHOTS, Snapshot
+from app.services.works_index import get_works_index
+from app.services.works_parser import parse_works
+from app.services.works_sync import (
+    dump_state,
+    load_state,
+    merged_works,
+    reusable_citations,
+    store_citations,
+    sync_works,
 )
 
+logger = logging.getLogger(__name__)
 
-def search_by_name(query: str, max_results: int) -> List[Dict[str, str]]:
+
+async def search_by_name(query: str, max_results: int) -> List[Dict[str, str]]:
     """
     Busca autores cujo nome corresponde ao termo.
 
@@ -38,10 +57,10 @@ def search_by_name(query: str, max_results: int) -> List[Dict[str, str]]:
     Returns:
         List[Dict[str, str]]: Lista de dicionários contendo 'orcid' e 'full_name'.
     """
-    return search_orcid_by_name(query, max_results)
+    return await search_orcid_by_name_async(query, max_results)
 
 
-def get_name(orcid_id: str) -> Dict[str, Any]:
+async def get_name(orcid_id: str) -> Dict[str, Any]:
     """
     Retorna o nome completo formatado do autor ORCID.
 
@@ -51,11 +70,11 @@ def get_name(orcid_id: str) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Dicionário com o nome completo e campos relacionados.
     """
-    data = fetch_orcid(orcid_id)
+    data = await fetch_orcid_async(orcid_id)
     return format_name(data)
 
 
-def get_keywords(orcid_id: str) -> Dict[str, Any]:
+async def get_keywords(orcid_id: str) -> Dict[str, Any]:
     """
     Retorna as keywords associadas ao autor ORCID.
 
@@ -65,11 +84,11 @@ def get_keywords(orcid_id: str) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: {'keywords': List[str]} com as palavras-chave do autor.
     """
-    data = fetch_orcid(orcid_id, section="keywords")
+    data = await fetch_orcid_async(orcid_id, section="keywords")
     return {"keywords": format_keywords(data)}
 
 
-def get_personal(orcid_id: str) -> Dict[str, Any]:
+async def get_personal(orcid_id: str) -> Dict[str, Any]:
     """
     Retorna informações pessoais do autor (nome, biografia, e-mails, etc.).
 
@@ -79,36 +98,36 @@ def get_personal(orcid_id: str) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Dados pessoais formatados do autor.
     """
-    data = fetch_orcid(orcid_id, section="person")
+    data = await fetch_orcid_async(orcid_id, section="person")
     return format_personal(data)
 
 
-def get_employments(orcid_id: str) -> List[Dict[str, Any]]:
+async def get_employments(orcid_id: str) -> List[Dict[str, Any]]:
     """
     Retorna histórico de empregos do autor.
     Se algo falhar na formatação, retorna lista vazia.
     """
-    raw = fetch_orcid(orcid_id, section="employments")
+    raw = await fetch_orcid_async(orcid_id, section="employments")
     try:
         return format_employment(raw or {})
     except Exception:
         return []
 
-def get_educations(orcid_id: str) -> List[Dict[str, Any]]:
+async def get_educations(orcid_id: str) -> List[Dict[str, Any]]:
     """
     Retorna histórico educacional e qualificações do autor.
     """
-    raw = fetch_orcid(orcid_id, section="educations")
+    raw = await fetch_orcid_async(orcid_id, section="educations")
     try:
         return format_education_and_qualifications(raw or {})
     except Exception:
         return []
 
 
-def get_all_data(orcid_id: str) -> Dict[str, Any]:
+async def fetch_all_data(orcid_id: str) -> Dict[str, Any]:
     """
     Monta um JSON unificado com nome, obras, keywords, dados pessoais,
-    histórico de empregos e formações de um autor.
+    histórico de empregos e formações de um autor, direto do ORCID.
 
     Args:
         orcid_id (str): Identificador ORCID do autor.
@@ -117,19 +136,29 @@ def get_all_data(orcid_id: str) -> Dict[str, Any]:
         Dict[str, Any]: Dicionário contendo todos os dados agrupados,
         ou vazio se o ORCID não for encontrado.
     """
-    basic = fetch_orcid(orcid_id)
+    basic = await fetch_orcid_async(orcid_id)
     if not basic:
         return {}
 
-    keywords = fetch_orcid(orcid_id, section="keywords")
-    personal = fetch_orcid(orcid_id, section="person")
-    emp = fetch_orcid(orcid_id, section="employments")
-    edu = fetch_orcid(orcid_id, section="educations")
-    works = fetch_orcid(orcid_id, section="works")
+    # O registro completo já traz todas as seções; só as ausentes são
+    # buscadas, em paralelo
+    sections = split_record_sections(basic)
+    missing = [name for name, data in sections.items() if data is None]
+    if missing:
+        fetched = await asyncio.gather(
+            *(fetch_orcid_async(orcid_id, section=name) for name in missing)
+        )
+        sections.update(zip(missing, fetched))
+
+    keywords = sections["keywords"]
+    personal = sections["person"]
+    emp = sections["employments"]
+    edu = sections["educations"]
+    works = sections["works"]
 
     return {
         "name":        basic.get("person", {}).get("name", {}),
-        "works":       format_orcid_works(works or {}),
+        "works":       works_to_dicts(format_orcid_works(works or {})),
         "keywords":    format_keywords(keywords or {}),
         "personal":    format_personal(personal or {}),
         "employments": format_employment(emp or {}),
@@ -137,53 +166,47 @@ def get_all_data(orcid_id: str) -> Dict[str, Any]:
     }
 
 
-def get_works(orcid_id: str) -> Dict[str, Any]:
+def _doi_citation_ids(works: List[Work], dois: List[Optional[str]]) -> Dict[str, Any]:
+    """
+    Monta mapeamento "doi:<doi normalizado>" → ano para consulta de citações.
+    """
+    return {f"doi:{d}": w.year for w, d in zip(works, dois) if d}
+
+
+def _attach_citations(
+    works: List[Work],
+    dois: List[Optional[str]],
+    doi_to_cit: Dict[str, int]
+) -> None:
+    """
+    Anexa cited_by_count a cada obra, a partir do mapeamento de citações por DOI.
+    """
+    for w, d in zip(works, dois):
+        w.cited_by_count = doi_to_cit.get(f"doi:{d}", 0) if d else 0
+
+
+async def get_works(orcid_id: str) -> Tuple[Dict[str, Any], float]:
     """
     Busca todas as obras de um autor no ORCID e anexa contagem de citações (via OpenAlex).
+    Servido do snapshot "dashboard" quando o autor já é conhecido.
 
     Args:
         orcid_id (str): Identificador ORCID do autor.
 
     Returns:
-        Dict[str, Any]: {
+        Tuple[Dict[str, Any], float]: ({
             "orcid_id": str,
             "works": List[Dict[str, Any]]
-        }
+        }, idade dos dados em segundos)
 
     Raises:
         HTTPException: Em caso de falha ao obter citações.
     """
-    raw = fetch_orcid(orcid_id, section="works") or {}
-    works = format_orcid_works(raw) or []
-
-    # Monta mapeamento DOI → ano
-    ids_para_cit = {}
-    for w in works:
-        doi = w.get("doi")
-        if doi:
-            d_norm = normalize_doi(doi)
-            ids_para_cit[f"doi:{d_norm}"] = w.get("year", 0)
-
-    try:
-        doi_to_cit = fetch_citations(ids_para_cit)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Erro ao obter citações: {e}")
-
-    # Anexa citado_por_count a cada obra
-    for w in works:
-        doi = w.get("doi")
-        if doi:
-            key = f"doi:{normalize_doi(doi)}"
-            w["cited_by_count"] = doi_to_cit.get(key, 0)
-        else:
-            w["cited_by_count"] = 0
+    snapshot, age = await _get_snapshot(orcid_id, "dashboard")
+    return {"orcid_id": orcid_id, "works": snapshot["works"]}, age
 
-    return {"orcid_id": orcid_id, "works": works}
 
-
-def get_works_with_authors(orcid_id: str) -> Dict[str, Any]:
+async def get_works_with_authors(orcid_id: str) -> Dict[str, Any]:
     """
     Retorna todas as obras de um autor com lista de coautores.
 
@@ -191,42 +214,55 @@ def get_works_with_authors(orcid_id: str) -> Dict[str, Any]:
         orcid_id (str): Identificador ORCID do autor.
 
     Returns:
-        Dict[str, Any]: {'works': List[Dict[str, Any]]}
+        Dict[str, Any]: {'works': List[Work]}
 
     Raises:
         HTTPException: Em caso de erro na chamada ao ORCID.
     """
     try:
-        works = format_works_with_contributors(orcid_id)
+        works = await format_works_with_contributors_async(orcid_id)
         return {"works": works}
     except HTTPException:
         raise
 
 
-def get_works_openalex(orcid_id: str) -> Dict[str, Any]:
+async def get_works_openalex(orcid_id: str) -> AsyncIterator[bytes]:
     """
-    Recupera publicações de um autor via OpenAlex, incluindo coautores e citações.
+    Recupera publicações de um autor via OpenAlex, incluindo coautores e citações,
+    como um JSON em partes ({"works": [...]}) gerado página a página.
+
+    A primeira página é buscada antes de retornar, para que erros do OpenAlex
+    ainda possam virar uma resposta HTTP de erro; as demais são buscadas
+    conforme o corpo é enviado.
 
     Args:
         orcid_id (str): Identificador ORCID do autor.
 
     Returns:
-        Dict[str, Any]: {'works': List[Dict[str, Any]]}
+        AsyncIterator[bytes]: Partes do JSON {'works': List[Dict[str, Any]]}
 
     Raises:
-        HTTPException: Em caso de erro inesperado.
+        HTTPException: Em caso de erro ao acessar o OpenAlex.
     """
-    try:
-        from api_clients.openalex_client import format_works_from_openalex
-        works = format_works_from_openalex(orcid_id)
-        return {"works": works}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro inesperado: {e}")
+    pages = aiter_works_openalex(orcid_id, select=WORK_FIELDS)
+    first = await anext(pages, None)
+
+    async def body() -> AsyncIterator[bytes]:
+        yield b'{"works": ['
+        page, sep = first, b""
+        while page:
+            yield sep + b",".join(
+                json.dumps(format_work_with_coauthors(item).to_openalex_dict(), ensure_ascii=False).encode("utf-8")
+                for item in page
+            )
+            sep = b","
+            page = await anext(pages, None)
+        yield b"]}"
+
+    return body()
 
 
-def filter_works_by_keyword(
+async def filter_works_by_keyword(
     orcid_id: str,
     keyword: str,
     year: Optional[int] = None
@@ -244,14 +280,11 @@ def filter_works_by_keyword(
             "orcid_id": str,
             "keyword_searched": str,
             "year_filter": Optional[int],
-            "works": List[Dict[str, Any]]
+            "works": List[Work]
         }
     """
-    raw = fetch_orcid(orcid_id, section="works") or {}
-    works = format_orcid_works(raw) or []
-    if year is not None:
-        works = filter_by_year(works, year)
-    filtered = filter_by_keyword(works, keyword)
+    index = await get_works_index(orcid_id)
+    filtered = index.select(year, keyword)
     return {
         "orcid_id":        orcid_id,
         "keyword_searched": keyword,
@@ -260,7 +293,7 @@ def filter_works_by_keyword(
     }
 
 
-def filter_works_by_year(
+async def filter_works_by_year(
     orcid_id: str,
     year: int,
     keyword: Optional[str] = None
@@ -278,14 +311,11 @@ def filter_works_by_year(
             "orcid_id": str,
             "year": int,
             "keyword_filter": Optional[str],
-            "works": List[Dict[str, Any]]
+            "works": List[Work]
         }
     """
-    raw = fetch_orcid(orcid_id, section="works") or {}
-    works = format_orcid_works(raw) or []
-    filtered = filter_by_year(works, year)
-    if keyword:
-        filtered = filter_by_keyword(filtered, keyword)
+    index = await get_works_index(orcid_id)
+    filtered = index.select(year, keyword)
     return {
         "orcid_id":       orcid_id,
         "year":           year,
@@ -294,7 +324,7 @@ def filter_works_by_year(
     }
 
 
-def filter_works_by_citations(
+async def filter_works_by_citations(
     orcid_id: str,
     year: Optional[int] = None,
     keyword: Optional[str] = None
@@ -313,36 +343,29 @@ def filter_works_by_citations(
             "orcid_id": str,
             "year_filter": Optional[int],
             "keyword_filter": Optional[str],
-            "works_sorted_by_citations": List[Dict[str, Any]]
+            "works_sorted_by_citations": List[Work]
         }
     """
-    raw = fetch_orcid(orcid_id, section="works") or {}
-    works = format_orcid_works(raw) or []
-    if year is not None:
-        works = filter_by_year(works, year)
-    if keyword:
-        works = filter_by_keyword(works, keyword)
+    index = await get_works_index(orcid_id)
+    selected = index.search(year, keyword)
+    dois = index.parsed.dois
     ids_para_cit = {
-        f"doi:{normalize_doi(w['doi'])}": w.get("year", 0)
-        for w in works
-        if w.get("doi")
+        f"doi:{dois[i]}": index.works[i].year
+        for i in selected
+        if dois[i]
     }
-    doi_to_cit = fetch_citations(ids_para_cit)
-    unique: List[Dict[str, Any]] = []
+    doi_to_cit = await fetch_citations_async(ids_para_cit)
+    # As obras do índice são compartilhadas: a contagem vai numa cópia
+    unique: List[Work] = []
     seen: Set[str] = set()
-    for w in works:
-        doi = w.get("doi")
-        if not doi:
-            unique.append({**w, "cited_by_count": 0})
-            continue
-        d_norm = normalize_doi(doi)
+    for i in selected:
+        d_norm = dois[i]
         if d_norm in seen:
             continue
-        seen.add(d_norm)
-        w_copy = w.copy()
-        w_copy["cited_by_count"] = doi_to_cit.get(f"doi:{d_norm}", 0)
-        unique.append(w_copy)
-    sorted_works = sorted(unique, key=lambda x: x["cited_by_count"], reverse=True)
+        if d_norm:
+            seen.add(d_norm)
+        unique.append(replace(index.works[i], cited_by_count=doi_to_cit.get(f"doi:{d_norm}", 0) if d_norm else 0))
+    sorted_works = sorted(unique, key=lambda x: x.cited_by_count, reverse=True)
     return {
         "orcid_id":                  orcid_id,
         "year_filter":               year,
@@ -351,52 +374,505 @@ def filter_works_by_citations(
     }
 
 
-def get_orcid_metrics(orcid_id: str) -> Dict[str, Any]:
+# Consulta combinada de obras: chaves de ordenação ("-" = decrescente)
+QUERY_SORT_KEYS = ("year", "-year", "citations", "-citations", "title", "-title")
+QUERY_DEFAULT_LIMIT = 50
+QUERY_MAX_LIMIT = 200
+
+
+def _encode_cursor(sort: str, key: Any, index: int) -> str:
+    raw = json.dumps([sort, key, index], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    try:
+        cur_sort, key, index = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if cur_sort != sort:
+        raise HTTPException(status_code=400, detail="Cursor gerado para outra ordenação")
+    # Chave do título é texto; de ano e citações, inteiro (bool não vale)
+    key_type = str if sort.lstrip("-") == "title" else int
+    if (
+        not isinstance(key, key_type) or isinstance(key, bool)
+        or not isinstance(index, int) or isinstance(index, bool)
+    ):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return key, index
+
+
+def _year_key(work: Work) -> int:
+    year = work.year
+    if isinstance(year, str):
+        return int(year) if year.isdigit() else 0
+    return year or 0
+
+
+async def query_works(
+    orcid_id: str,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    keyword: Optional[str] = None,
+    work_type: Optional[str] = None,
+    min_citations: Optional[int] = None,
+    sort: str = "-year",
+    limit: int = QUERY_DEFAULT_LIMIT,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Consulta as obras de um autor combinando intervalo de anos, palavra-chave,
+    tipo e mínimo de citações, com ordenação e paginação por cursor.
+
+    Os predicados são resolvidos no índice das obras em cache (WorksIndex).
+    As citações vêm do cache de citações e só são consultadas para todas as
+    obras selecionadas quando o filtro ou a ordenação dependem delas; caso
+    contrário, apenas as da página retornada.
+
+    O cursor guarda a chave de ordenação e a posição da última obra
+    entregue, de modo que as páginas seguintes continuam do mesmo ponto.
+    Empates são desfeitos pela ordem das obras no ORCID.
+
+    Args:
+        orcid_id (str): Identificador ORCID do autor.
+        year_from, year_to (Optional[int]): Intervalo de anos (inclusivo).
+        keyword (Optional[str]): Palavra-chave buscada nos títulos.
+        work_type (Optional[str]): Tipo da obra (ex.: "journal-article").
+        min_citations (Optional[int]): Mínimo de citações.
+        sort (str): Uma de QUERY_SORT_KEYS.
+        limit (int): Tamanho da página.
+        cursor (Optional[str]): Valor de next_cursor da página anterior.
+
+    Returns:
+        Dict[str, Any]: {
+            "orcid_id": str,
+            "total": int,
+            "works": List[Work],
+            "next_cursor": Optional[str]
+        }
+
+    Raises:
+        HTTPException: 400 para cursor inválido; erros do ORCID/OpenAlex.
+    """
+    index = await get_works_index(orcid_id)
+    selected = index.search(
+        keyword=keyword, year_from=year_from, year_to=year_to, work_type=work_type
+    )
+    dois = index.parsed.dois
+    field = sort.lstrip("-")
+    descending = sort.startswith("-")
+
+    async def citations_for(indices: List[int]) -> Dict[int, int]:
+        found = await fetch_citations_async({
+            f"doi:{dois[i]}": _year_key(index.works[i]) for i in indices if dois[i]
+        })
+        return {i: found.get(f"doi:{dois[i]}", 0) if dois[i] else 0 for i in indices}
+
+    citations: Dict[int, int] = {}
+    if min_citations or field == "citations":
+        citations = await citations_for(selected)
+        if min_citations:
+            selected = [i for i in selected if citations[i] >= min_citations]
+
+    if field == "citations":
+        key_of = citations.__getitem__
+    elif field == "title":
+        key_of = index.folded.__getitem__
+    else:
+        key_of = lambda i: _year_key(index.works[i])
+    # `selected` já está na ordem do documento e a ordenação é estável
+    ordered = sorted(selected, key=key_of, reverse=descending)
+
+    start = 0
+    if cursor:
+        last_key, last_index = _decode_cursor(cursor, sort)
+        start = next(
+            (
+                pos for pos, i in enumerate(ordered)
+                if (key_of(i) < last_key if descending else key_of(i) > last_key)
+                or (key_of(i) == last_key and i > last_index)
+            ),
+            len(ordered)
+        )
+    page = ordered[start : start + limit]
+
+    if field != "citations" and not min_citations:
+        citations = await citations_for(page)
+    next_cursor = None
+    if start + limit < len(ordered):
+        next_cursor = _encode_cursor(sort, key_of(page[-1]), page[-1])
+
+    return {
+        "orcid_id":    orcid_id,
+        "total":       len(ordered),
+        "works":       [replace(index.works[i], cited_by_count=citations[i]) for i in page],
+        "next_cursor": next_cursor
+    }
+
+
+async def get_orcid_metrics(orcid_id: str) -> Tuple[Dict[str, Any], float]:
     """
     Retorna métricas agregadas do autor ORCID:
     total de publicações, total de citações, média de citações,
     fator de impacto (últimos 2 anos), h-index, i10-index e
-    pesquisa mais citada.
+    pesquisa mais citada. Servido do snapshot "dashboard".
 
     Args:
         orcid_id (str): Identificador ORCID do autor.
 
     Returns:
-        Dict[str, Any]: Métricas calculadas.
+        Tuple[Dict[str, Any], float]: Métricas calculadas e idade dos dados em segundos.
 
     Raises:
         HTTPException: Em caso de erro ao buscar dados ou citações.
     """
-    orcid_data = fetch_orcid(orcid_id, section="works")
-    ids, no_id_years = parse_orcid_data(orcid_data or {})
-    citations = fetch_citations(ids)
-    years, pubs_y, cites_y = count_by_year(ids, no_id_years, citations)
-    return compute_metrics(years, pubs_y, cites_y, ids, no_id_years, citations)
+    snapshot, age = await _get_snapshot(orcid_id, "dashboard")
+    return snapshot["metrics"], age
 
 
-def get_orcid_stats(orcid_id: str) -> Dict[str, Any]:
+async def get_orcid_stats(orcid_id: str) -> Tuple[Dict[str, Any], float]:
     """
     Retorna série temporal de publicações e citações por ano.
+    Servido do snapshot "dashboard".
 
     Args:
         orcid_id (str): Identificador ORCID do autor.
 
     Returns:
-        Dict[str, Any]: {
+        Tuple[Dict[str, Any], float]: ({
             "years": List[int],
             "publications": List[int],
             "citations": List[int]
+        }, idade dos dados em segundos)
+
+    Raises:
+        HTTPException: Em caso de erro ao buscar dados ou citações.
+    """
+    snapshot, age = await _get_snapshot(orcid_id, "dashboard")
+    return snapshot["stats"], age
+
+
+def _metrics_and_stats(
+    ids: Dict[str, int],
+    no_id_years: List[int],
+    citations: Dict[str, int]
+) -> Tuple[Dict[str, Any], Dict[str, List[int]]]:
+    """
+    Métricas agregadas e série anual ({"years", "publications", "citations"}),
+    calculadas sobre os mesmos arrays por obra, montados uma única vez.
+    """
+    arrays = work_arrays(ids, no_id_years, citations)
+    years, pubs_y, cites_y = yearly_series(*arrays)
+    stats = {
+        "years":        years.tolist(),
+        "publications": pubs_y.tolist(),
+        "citations":    cites_y.tolist()
+    }
+    return author_metrics(*arrays), stats
+
+
+async def build_dashboard(orcid_id: str) -> Dict[str, Any]:
+    """
+    Calcula, a partir de uma única busca de obras e de citações, tudo o que o
+    dashboard exibe: obras com citações, métricas agregadas e série anual.
+
+    Args:
+        orcid_id (str): Identificador ORCID do autor.
+
+    Returns:
+        Dict[str, Any]: {
+            "orcid_id": str,
+            "works": List[Dict[str, Any]],
+            "metrics": Dict[str, Any],
+            "stats": {"years": List[int], "publications": List[int], "citations": List[int]}
         }
 
     Raises:
         HTTPException: Em caso de erro ao buscar dados ou citações.
     """
-    orcid_data = fetch_orcid(orcid_id, section="works")
-    ids, no_id_years = parse_orcid_data(orcid_data or {})
-    citations = fetch_citations(ids)
-    years, pubs_y, cites_y = count_by_year(ids, no_id_years, citations)
+    raw = await fetch_orcid_async(orcid_id, section="works") or {}
+
+    # Sincronização incremental: só grupos com last-modified-date novo são
+    # reprocessados, e só os IDs deles (ou sem contagem guardada) são consultados
+    previous = await SNAPSHOTS.get_async(orcid_id, "works_sync")
+    state, changed = sync_works(raw, load_state(previous.payload) if previous else None)
+    works, ids, no_id_years, dois = merged_works(state)
+
+    # Uma só consulta cobre os DOIs da listagem e os IDs usados nas métricas
+    needed = {**_doi_citation_ids(works, dois), **ids}
+    stored = reusable_citations(state, changed)
+    to_fetch = {key: year for key, year in needed.items() if key not in stored}
+    try:
+        fetched = await fetch_citations_async(to_fetch, fill_missing=False)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Erro ao obter citações: {e}")
+    all_citations = {key: stored.get(key, fetched.get(key, 0)) for key in needed}
+    _attach_citations(works, dois, all_citations)
+
+    # Lotes que falharam ficam com 0 só nesta resposta; não são gravados
+    store_citations(state, set(needed), stored, fetched)
+    await SNAPSHOTS.put_async(orcid_id, "works_sync", dump_state(state))
+
+    citations = {key: all_citations.get(key, 0) for key in ids}
+    metrics, stats = _metrics_and_stats(ids, no_id_years, citations)
     return {
-        "years":        years,
-        "publications": pubs_y,
-        "citations":    cites_y
+        "orcid_id": orcid_id,
+        "works":    works_to_dicts(works),
+        "metrics":  metrics,
+        "stats":    stats
     }
+
+
+async def get_all_data(orcid_id: str) -> Dict[str, Any]:
+    """
+    Retorna o JSON unificado do autor (ver fetch_all_data), servido do
+    snapshot local quando o autor já é conhecido.
+
+    Args:
+        orcid_id (str): Identificador ORCID do autor.
+
+    Returns:
+        Dict[str, Any]: Dicionário contendo todos os dados agrupados,
+        ou vazio se o ORCID não for encontrado.
+    """
+    payload, _ = await _get_snapshot(orcid_id, "profile")
+    return payload
+
+
+async def get_dashboard(orcid_id: str) -> Tuple[Dict[str, Any], float]:
+    """
+    Retorna os dados do dashboard (ver build_dashboard), servidos do
+    snapshot local quando o autor já é conhecido.
+
+    Args:
+        orcid_id (str): Identificador ORCID do autor.
+
+    Returns:
+        Tuple[Dict[str, Any], float]: ({"orcid_id", "works", "metrics", "stats"},
+        idade dos dados em segundos)
+    """
+    return await _get_snapshot(orcid_id, "dashboard")
+
+
+# Métricas em lote: autores buscados em paralelo e processados em levas
+BULK_METRICS_CONCURRENCY = 8
+BULK_METRICS_BATCH = 50
+
+
+async def _fetch_bulk_works(
+    orcid_ids: List[str],
+    semaphore: asyncio.Semaphore
+) -> List[Tuple[str, Any]]:
+    """
+    Busca /works de cada autor com concorrência limitada. Retorna
+    (orcid_id, (ids, no_id_years)) ou (orcid_id, HTTPException) por autor;
+    erros de um autor (inclusive ao interpretar o documento) não
+    interrompem os demais.
+    """
+    async def run(oid: str) -> Tuple[str, Any]:
+        try:
+            async with semaphore:
+                raw = await fetch_orcid_async(oid, section="works") or {}
+            parsed = parse_works(raw)
+            return oid, (parsed.ids, parsed.no_id_years)
+        except HTTPException as e:
+            return oid, e
+        except Exception as e:
+            logger.exception("Erro ao processar obras de %s", oid)
+            return oid, HTTPException(status_code=500, detail=f"Erro ao processar obras: {e}")
+
+    return await asyncio.gather(*(run(oid) for oid in orcid_ids))
+
+
+async def get_bulk_metrics(orcid_ids: List[str]) -> AsyncIterator[bytes]:
+    """
+    Calcula as métricas de vários autores (ex.: um departamento) como NDJSON:
+    uma linha {"orcid_id", "metrics"} (ou {"orcid_id", "error"}) por autor,
+    na ordem pedida, e uma última linha {"cohort": {...}} com as métricas do
+    conjunto de obras do grupo e a distribuição do h-index entre os autores.
+
+    Os autores são processados em levas de BULK_METRICS_BATCH, com até
+    BULK_METRICS_CONCURRENCY buscas simultâneas ao ORCID. Em cada leva, os IDs
+    de todos os autores são unidos numa só consulta de citações, de modo que
+    uma obra compartilhada por coautores é consultada uma única vez; nas
+    métricas do grupo, ela também é contada uma única vez.
+
+    Args:
+        orcid_ids (List[str]): Identificadores ORCID (já normalizados).
+
+    Returns:
+        AsyncIterator[bytes]: Linhas NDJSON.
+    """
+    orcid_ids = list(dict.fromkeys(orcid_ids))
+    semaphore = asyncio.Semaphore(BULK_METRICS_CONCURRENCY)
+
+    async def body() -> AsyncIterator[bytes]:
+        cohort_ids: Dict[str, int] = {}
+        cohort_no_id_years: List[int] = []
+        cohort_citations: Dict[str, int] = {}
+        h_values: List[int] = []
+        failed = 0
+
+        for start in range(0, len(orcid_ids), BULK_METRICS_BATCH):
+            wave = await _fetch_bulk_works(orcid_ids[start : start + BULK_METRICS_BATCH], semaphore)
+            parsed = [(oid, res) for oid, res in wave if not isinstance(res, HTTPException)]
+
+            needed: Dict[str, int] = {}
+            for _, (ids, _) in parsed:
+                needed.update(ids)
+            try:
+                citations = await fetch_citations_async(needed)
+            except HTTPException as e:
+                logger.warning("Falha ao obter citações em lote: %s", e.detail)
+                citations = {}
+            cohort_citations.update(citations)
+
+            arrays = WorkArrays.from_authors([
+                work_arrays(ids, no_id_years, citations) for _, (ids, no_id_years) in parsed
+            ])
+            rows = iter(authors_metrics(arrays))
+
+            for oid, res in wave:
+                if isinstance(res, HTTPException):
+                    failed += 1
+                    line = {"orcid_id": oid, "error": res.detail}
+                else:
+                    ids, no_id_years = res
+                    cohort_ids.update(ids)
+                    cohort_no_id_years.extend(no_id_years)
+                    line = {"orcid_id": oid, "metrics": next(rows)}
+                    h_values.append(line["metrics"]["h_index"])
+                yield json.dumps(line, ensure_ascii=False).encode("utf-8") + b"\n"
+
+        metrics, stats = _metrics_and_stats(cohort_ids, cohort_no_id_years, cohort_citations)
+        h = np.asarray(h_values, dtype=np.int64)
+        cohort = {
+            "autores":         len(h_values),
+            "falhas":          failed,
+            "metrics":         metrics,
+            "h_index_medio":   round(float(h.mean()), 2) if len(h) else 0.0,
+            "h_index_mediano": float(np.median(h)) if len(h) else 0.0,
+            "h_index_maximo":  int(h.max()) if len(h) else 0,
+            "stats":           stats
+        }
+        yield json.dumps({"cohort": cohort}, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    return body()
+
+
+# Snapshots persistentes: tipo → função que o monta a partir das APIs
+SNAPSHOT_BUILDERS = {
+    "profile":   fetch_all_data,
+    "dashboard": build_dashboard,
+}
+SNAPSHOT_MAX_AGE = 6 * 60 * 60
+SNAPSHOT_REFRESH_INTERVAL = 5 * 60
+SNAPSHOT_REFRESH_BATCH = 20
+
+# Stale-while-revalidate: snapshots mais antigos que SWR_MAX_AGE segundos são
+# servidos na hora e revalidados em segundo plano (SWR_ENABLED=0 desativa)
+SWR_ENABLED = os.environ.get("SWR_ENABLED", "1") != "0"
+SWR_MAX_AGE = int(os.environ.get("SWR_MAX_AGE", 15 * 60))
+_REFRESH_TASKS: Set[asyncio.Task] = set()
+
+
+async def _rebuild_snapshot(orcid_id: str, kind: str) -> Optional[Snapshot]:
+    """
+    Monta o snapshot a partir das APIs e o grava; chamadas concorrentes para
+    o mesmo autor/tipo compartilham a mesma reconstrução.
+    """
+    async def build() -> Optional[Snapshot]:
+        payload = await SNAPSHOT_BUILDERS[kind](orcid_id)
+        return await SNAPSHOTS.put_async(orcid_id, kind, payload) if payload else None
+
+    return await IN_FLIGHT.do_async(("snapshot", orcid_id, kind), build)
+
+
+async def _refresh_in_background(orcid_id: str, kind: str) -> None:
+    try:
+        await _rebuild_snapshot(orcid_id, kind)
+    except HTTPException as e:
+        logger.warning("Falha ao revalidar snapshot %s/%s: %s", orcid_id, kind, e.detail)
+    except Exception:
+        logger.exception("Erro ao revalidar snapshot %s/%s", orcid_id, kind)
+
+
+def _schedule_refresh(orcid_id: str, kind: str) -> None:
+    task = asyncio.create_task(_refresh_in_background(orcid_id, kind))
+    # Mantém referência até o fim para a task não ser coletada
+    _REFRESH_TASKS.add(task)
+    task.add_done_callback(_REFRESH_TASKS.discard)
+
+
+async def _get_snapshot(orcid_id: str, kind: str) -> Tuple[Dict[str, Any], float]:
+    """
+    Lê o snapshot do autor no SNAPSHOTS e retorna (payload, idade em segundos).
+    Se ainda não existir, monta-o a partir das APIs e o grava.
+
+    Snapshots com mais de SWR_MAX_AGE segundos são tratados conforme o modo:
+    com SWR_ENABLED, o snapshot antigo é retornado na hora e uma revalidação é
+    agendada em segundo plano; sem SWR, a chamada espera a reconstrução
+    (e cai para o snapshot antigo se as APIs falharem).
+    """
+    snapshot = await SNAPSHOTS.get_async(orcid_id, kind, touch=True)
+    if snapshot is not None:
+        if snapshot.age <= SWR_MAX_AGE:
+            return snapshot.payload, snapshot.age
+        if SWR_ENABLED:
+            _schedule_refresh(orcid_id, kind)
+            return snapshot.payload, snapshot.age
+        try:
+            fresh = await _rebuild_snapshot(orcid_id, kind)
+        except HTTPException as e:
+            logger.warning("Servindo snapshot antigo de %s/%s: %s", orcid_id, kind, e.detail)
+            return snapshot.payload, snapshot.age
+        return (fresh.payload, fresh.age) if fresh else (snapshot.payload, snapshot.age)
+
+    fresh = await _rebuild_snapshot(orcid_id, kind)
+    return (fresh.payload, fresh.age) if fresh else ({}, 0.0)
+
+
+async def refresh_stale_snapshots(
+    max_age: float = SNAPSHOT_MAX_AGE,
+    limit: int = SNAPSHOT_REFRESH_BATCH
+) -> int:
+    """
+    Remove os autores não requisitados há mais de SNAPSHOT_RETENTION_DAYS
+    dias e reconstrói até `limit` snapshots mais antigos que `max_age`
+    segundos. Falhas são registradas por snapshot e o antigo é mantido.
+    Retorna quantos snapshots foram atualizados.
+    """
+    evicted = await SNAPSHOTS.evict_async()
+    if evicted:
+        logger.info("Removidos %d snapshots de autores sem requisições recentes", evicted)
+
+    refreshed = 0
+    for orcid_id, kind in await SNAPSHOTS.stale_async(max_age, limit, kinds=list(SNAPSHOT_BUILDERS)):
+        builder = SNAPSHOT_BUILDERS.get(kind)
+        if builder is None:
+            continue
+        try:
+            fresh = await _rebuild_snapshot(orcid_id, kind)
+        except HTTPException as e:
+            logger.warning("Falha ao atualizar snapshot %s/%s: %s", orcid_id, kind, e.detail)
+            continue
+        except Exception:
+            logger.exception("Erro ao atualizar snapshot %s/%s", orcid_id, kind)
+            continue
+        if fresh is not None:
+            refreshed += 1
+    return refreshed
+
+
+async def run_snapshot_refresher(interval: float = SNAPSHOT_REFRESH_INTERVAL) -> None:
+    """
+    Laço em segundo plano que atualiza periodicamente os snapshots antigos.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_stale_snapshots()
+        except Exception:
+            logger.exception("Erro no refresh de snapshots")
@@ -0,0 +1,194 @@
+# app/services/snapshot_store.py
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+# Caminho do banco SQLite com os snapshots dos autores
+SNAPSHOT_DB_PATH = os.environ.get("SNAPSHOT_DB_PATH", "snapshots.db")
+
+# Autores sem requisições há mais de SNAPSHOT_RETENTION_DAYS dias são removidos
+SNAPSHOT_RETENTION_DAYS = float(os.environ.get("SNAPSHOT_RETENTION_DAYS", 30))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    orcid_id    TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    accessed_at REAL,
+    PRIMARY KEY (orcid_id, kind)
+);
+CREATE INDEX IF NOT EXISTS snapshots_fetched_at ON snapshots (fetched_at);
+"""
+
+# Leituras só regravam accessed_at se a marca anterior for mais antiga que isto
+_TOUCH_INTERVAL = 60 * 60
+
+
+class Snapshot:
+    """
+    Dados normalizados de um autor (ex.: perfil ou dashboard) e o momento
+    em que foram obtidos das APIs externas.
+    """
+    __slots__ = ("orcid_id", "kind", "payload", "fetched_at")
+
+    def __init__(self, orcid_id: str, kind: str, payload: Any, fetched_at: float):
+        self.orcid_id = orcid_id
+        self.kind = kind
+        self.payload = payload
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class SnapshotStore:
+    """
+    Armazena snapshots de autores em SQLite, chaveados por (orcid_id, kind),
+    para que sobrevivam a reinícios e possam ser servidos sem acessar o
+    ORCID/OpenAlex. O payload é guardado como JSON e cada leitura devolve
+    uma cópia nova.
+
+    O banco só é aberto em open() (no lifespan da aplicação) ou no primeiro
+    uso. Os métodos síncronos bloqueiam; nos handlers assíncronos use as
+    versões *_async, que rodam em thread (inclusive o json.loads/dumps).
+    """
+
+    def __init__(self, path: str = SNAPSHOT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def open(self) -> None:
+        with self._lock:
+            self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Chamado com self._lock adquirido
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, orcid_id: str, kind: str, touch: bool = False) -> Optional[Snapshot]:
+        """
+        Lê o snapshot; com touch=True, marca o autor como requisitado
+        (ver evict).
+        """
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT payload, fetched_at FROM snapshots WHERE orcid_id = ? AND kind = ?",
+                (orcid_id, kind)
+            ).fetchone()
+            if row is not None and touch:
+                now = time.time()
+                with conn:
+                    conn.execute(
+                        "UPDATE snapshots SET accessed_at = ? WHERE orcid_id = ? AND kind = ? "
+                        "AND (accessed_at IS NULL OR accessed_at < ?)",
+                        (now, orcid_id, kind, now - _TOUCH_INTERVAL)
+                    )
+        if row is None:
+            return None
+        return Snapshot(orcid_id, kind, json.loads(row[0]), row[1])
+
+    def put(self, orcid_id: str, kind: str, payload: Any) -> Snapshot:
+        fetched_at = time.time()
+        data = json.dumps(payload, ensure_ascii=False)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT INTO snapshots (orcid_id, kind, payload, fetched_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (orcid_id, kind) DO UPDATE SET "
+                    "payload = excluded.payload, fetched_at = excluded.fetched_at",
+                    (orcid_id, kind, data, fetched_at, fetched_at)
+                )
+        return Snapshot(orcid_id, kind, payload, fetched_at)
+
+    def stale(
+        self,
+        max_age: float,
+        limit: int = 50,
+        kinds: Optional[List[str]] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Lista (orcid_id, kind) dos snapshots mais antigos que `max_age` segundos,
+        do mais antigo para o mais recente, opcionalmente só dos tipos `kinds`.
+        """
+        cutoff = time.time() - max_age
+        query = "SELECT orcid_id, kind FROM snapshots WHERE fetched_at < ?"
+        params: List[Any] = [cutoff]
+        if kinds:
+            query += f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+        query += " ORDER BY fetched_at LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._connection().execute(query, params).fetchall()
+        return [(r[0], r[1]) for r in rows]
+
+    def evict(self, max_idle: float = SNAPSHOT_RETENTION_DAYS * 24 * 60 * 60) -> int:
+        """
+        Remove todos os snapshots dos autores sem requisições (get com
+        touch=True) há mais de `max_idle` segundos. Retorna quantas linhas
+        foram removidas.
+        """
+        cutoff = time.time() - max_idle
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                cur = conn.execute(
+                    "DELETE FROM snapshots WHERE orcid_id IN ("
+                    "SELECT orcid_id FROM snapshots GROUP BY orcid_id "
+                    "HAVING MAX(COALESCE(accessed_at, fetched_at)) < ?)",
+                    (cutoff,)
+                )
+        return cur.rowcount
+
+    def delete(self, orcid_id: str, kind: Optional[str] = None) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                if kind is None:
+                    conn.execute("DELETE FROM snapshots WHERE orcid_id = ?", (orcid_id,))
+                else:
+                    conn.execute(
+                        "DELETE FROM snapshots WHERE orcid_id = ? AND kind = ?", (orcid_id, kind)
+                    )
+
+    async def get_async(self, orcid_id: str, kind: str, touch: bool = False) -> Optional[Snapshot]:
+        return await asyncio.to_thread(self.get, orcid_id, kind, touch)
+
+    async def put_async(self, orcid_id: str, kind: str, payload: Any) -> Snapshot:
+        return await asyncio.to_thread(self.put, orcid_id, kind, payload)
+
+    async def stale_async(
+        self,
+        max_age: float,
+        limit: int = 50,
+        kinds: Optional[List[str]] = None
+    ) -> List[Tuple[str, str]]:
+        return await asyncio.to_thread(self.stale, max_age, limit, kinds)
+
+    async def evict_async(self, max_idle: float = SNAPSHOT_RETENTION_DAYS * 24 * 60 * 60) -> int:
+        return await asyncio.to_thread(self.evict, max_idle)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Instância global usada pelos serviços (o banco é aberto no lifespan)
+SNAPSHOTS = SnapshotStore()
@@ -0,0 +1,147 @@
+# app/services/works_index.py
+
+import re
+from typing import Dict, List, Optional, Set
+
+from api_clients.orcid_client import derive_orcid, fetch_orcid_async, normalize_name
+from api_clients.work import Work
+from app.services.works_parser import ParsedWorks, parse_works
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(folded: str) -> List[str]:
+    return _TOKEN_RE.findall(folded)
+
+
+def _trigrams(term: str) -> Set[str]:
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class WorksIndex:
+    """
+    Índice de busca das obras de um autor, montado uma vez por versão do
+    documento /works e guardado junto a ele no cache do ORCID:
+      - postings: token do título (sem acentos, via normalize_name) → índices
+        das obras, em ordem do documento
+      - trigrams: trigrama → tokens do vocabulário que o contêm, para achar
+        os tokens que contêm um trecho sem percorrer o vocabulário inteiro
+      - by_year: ano → índices das obras (de ParsedWorks)
+      - by_type: tipo da obra → índices das obras
+      - by_doi: DOI normalizado → obra (a primeira com cada DOI)
+
+    As obras são compartilhadas entre requisições e não devem ser alteradas.
+    """
+    __slots__ = ("parsed", "folded", "postings", "trigrams", "by_type", "by_doi")
+
+    def __init__(self, parsed: ParsedWorks):
+        self.parsed = parsed
+        self.folded: List[str] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.trigrams: Dict[str, Set[str]] = {}
+        self.by_type: Dict[str, List[int]] = {}
+        self.by_doi: Dict[str, Work] = {}
+        for i, (work, d_norm) in enumerate(zip(parsed.works, parsed.dois)):
+            folded = normalize_name(work.title)
+            self.folded.append(folded)
+            for tok in set(_tokens(folded)):
+                self.postings.setdefault(tok, []).append(i)
+            self.by_type.setdefault(work.type, []).append(i)
+            if d_norm:
+                self.by_doi.setdefault(d_norm, work)
+        for term in self.postings:
+            for tri in _trigrams(term):
+                self.trigrams.setdefault(tri, set()).add(term)
+
+    @property
+    def works(self) -> List[Work]:
+        return self.parsed.works
+
+    def _matching(self, tok: str) -> Optional[Set[int]]:
+        """
+        Obras com algum token do título que contém `tok`. Os tokens do
+        vocabulário candidatos saem da interseção das listas de trigramas
+        de `tok` e só eles são conferidos. Retorna None para trechos com
+        menos de 3 caracteres, que não filtram (a frase é conferida depois).
+        """
+        if len(tok) < 3:
+            return None
+        terms: Optional[Set[str]] = None
+        for tri in sorted(_trigrams(tok), key=lambda t: len(self.trigrams.get(t, ()))):
+            found = self.trigrams.get(tri)
+            if not found:
+                return set()
+            terms = set(found) if terms is None else terms & found
+            if not terms:
+                return set()
+        hits: Set[int] = set()
+        for term in terms:
+            if tok in term:
+                hits.update(self.postings[term])
+        return hits
+
+    def _in_years(self, year_from: Optional[int], year_to: Optional[int]) -> Set[int]:
+        hits: Set[int] = set()
+        for year, posting in self.parsed.by_year.items():
+            if (year_from is None or year >= year_from) and (year_to is None or year <= year_to):
+                hits.update(posting)
+        return hits
+
+    def search(
+        self,
+        year: Optional[int] = None,
+        keyword: Optional[str] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        work_type: Optional[str] = None
+    ) -> List[int]:
+        """
+        Índices (em ordem do documento) das obras do ano `year` (ou do
+        intervalo year_from..year_to), do tipo `work_type` e cujo título
+        contém `keyword`, sem diferenciar maiúsculas nem acentos.
+
+        Os candidatos saem da interseção das listas de ano, tipo e de cada
+        token da frase (ver _matching); a frase completa é conferida só neles.
+        """
+        if year is not None:
+            year_from = year_to = year
+
+        candidates: Optional[Set[int]] = None
+        if year_from is not None or year_to is not None:
+            candidates = self._in_years(year_from, year_to)
+        if work_type:
+            by_type = set(self.by_type.get(work_type, ()))
+            candidates = by_type if candidates is None else candidates & by_type
+
+        phrase = normalize_name(keyword).strip() if keyword else ""
+        if phrase:
+            # Listas menores primeiro: a interseção encolhe mais rápido
+            matches = (self._matching(tok) for tok in _tokens(phrase))
+            for hits in sorted((m for m in matches if m is not None), key=len):
+                candidates = hits if candidates is None else candidates & hits
+                if not candidates:
+                    return []
+            if candidates is None:
+                # Só trechos curtos (ou sem letras nem dígitos): confere todos os títulos
+                candidates = set(range(len(self.folded)))
+            candidates = {i for i in candidates if phrase in self.folded[i]}
+
+        if candidates is None:
+            return list(range(len(self.works)))
+        return sorted(candidates)
+
+    def select(self, year: Optional[int] = None, keyword: Optional[str] = None) -> List[Work]:
+        return [self.works[i] for i in self.search(year, keyword)]
+
+
+def build_works_index(raw: dict) -> WorksIndex:
+    return WorksIndex(parse_works(raw))
+
+
+async def get_works_index(orcid_id: str) -> WorksIndex:
+    """
+    Índice das obras do autor, reaproveitado enquanto o documento /works
+    em cache não mudar (inclusive após revalidações 304).
+    """
+    raw = await fetch_orcid_async(orcid_id, section="works") or {}
+    return derive_orcid(orcid_id, "works", raw, "works_index", build_works_index)
@@ -0,0 +1,68 @@
+# app/services/works_parser.py
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from api_clients.openalex_client import ID_TYPES
+from api_clients.orcid_client import format_work
+from api_clients.work import Work
+from app.utils.utils import normalize_doi
+
+
+@dataclass(slots=True)
+class ParsedWorks:
+    """
+    Todas as visões de /{orcid_id}/works obtidas numa só passada:
+      - works: listagem (mesma saída de format_works)
+      - ids: "<tp>:<valor>" → ano, pelo primeiro ID suportado de cada obra
+      - no_id_years: anos das obras sem ID suportado
+      - dois: DOI normalizado de cada obra (alinhado a works; None se não houver)
+      - by_year: ano → índices em works das obras daquele ano
+    """
+    works: List[Work] = field(default_factory=list)
+    ids: Dict[str, int] = field(default_factory=dict)
+    no_id_years: List[int] = field(default_factory=list)
+    dois: List[Optional[str]] = field(default_factory=list)
+    by_year: Dict[int, List[int]] = field(default_factory=dict)
+
+
+def _metric_key(summary: dict) -> Optional[str]:
+    """
+    Primeiro ID externo de tipo suportado (ID_TYPES), usado como chave das citações.
+    """
+    for ext in (summary.get("external-ids") or {}).get("external-id", []) or []:
+        tp = ext.get("external-id-type", "").lower()
+        if tp in ID_TYPES:
+            valor = ext.get("external-id-value", "").strip().lower()
+            if valor:
+                return f"{tp}:{valor}"
+    return None
+
+
+def parse_works(data: dict) -> ParsedWorks:
+    """
+    Percorre os works-groups uma única vez e produz a listagem, o mapa
+    ID → ano, os anos sem ID, os DOIs normalizados e o índice por ano,
+    sem repetir html.unescape / normalize_doi para a mesma obra.
+    """
+    parsed = ParsedWorks()
+    for group in (data or {}).get("group", []) or []:
+        for summary in group.get("work-summary", []) or []:
+            work = format_work(summary)
+            index = len(parsed.works)
+            parsed.works.append(work)
+            parsed.dois.append(normalize_doi(work.doi) if work.doi else None)
+
+            year = work.year
+            if isinstance(year, str) and year.isdigit():
+                year = int(year)
+            if not isinstance(year, int) or not year:
+                continue
+            parsed.by_year.setdefault(year, []).append(index)
+
+            key = _metric_key(summary)
+            if key is not None:
+                parsed.ids[key] = year
+            else:
+                parsed.no_id_years.append(year)
+    return parsed
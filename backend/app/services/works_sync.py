@@ -0,0 +1,169 @@
+# app/services/works_sync.py
+
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from api_clients.openalex_client import CITATION_TTL
+from api_clients.work import Work
+from app.services.works_parser import parse_works
+
+
+def _last_modified(node: Optional[dict]) -> Optional[int]:
+    return ((node or {}).get("last-modified-date") or {}).get("value")
+
+
+def group_key(group: dict) -> str:
+    """
+    Identifica um works-group pelos put-codes de seus resumos.
+    """
+    return ",".join(
+        str(summary.get("put-code"))
+        for summary in group.get("work-summary", []) or []
+    )
+
+
+def _parse_group(group: dict) -> Dict[str, Any]:
+    parsed = parse_works({"group": [group]})
+    return {
+        "last_modified": _last_modified(group),
+        "works":         parsed.works,
+        "ids":           parsed.ids,
+        "no_id_years":   parsed.no_id_years,
+        "dois":          parsed.dois,
+    }
+
+
+def _citation_keys(parsed: Dict[str, Any]) -> Set[str]:
+    keys = set(parsed["ids"])
+    keys.update(f"doi:{d}" for d in parsed["dois"] if d)
+    return keys
+
+
+def sync_works(raw: dict, previous: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Set[str]]:
+    """
+    Atualiza o estado de obras de um autor a partir do documento /works,
+    reaproveitando os grupos cujo `last-modified-date` não mudou.
+
+    Se o `last-modified-date` do documento for igual ao armazenado, nada é
+    reprocessado. Caso contrário, só os grupos novos ou alterados passam por
+    parse_works; grupos removidos são descartados.
+
+    Retorna (novo_estado, chaves de citação dos grupos novos/alterados).
+    """
+    previous = previous or {}
+    record_modified = _last_modified(raw)
+    if record_modified is not None and previous.get("last_modified") == record_modified:
+        return previous, set()
+
+    old_groups: Dict[str, Any] = previous.get("groups", {})
+    groups: Dict[str, Any] = {}
+    changed: Set[str] = set()
+    for group in raw.get("group", []) or []:
+        key = group_key(group)
+        old = old_groups.get(key)
+        modified = _last_modified(group)
+        if old is not None and modified is not None and old["last_modified"] == modified:
+            groups[key] = old
+            continue
+        parsed = _parse_group(group)
+        groups[key] = parsed
+        changed |= _citation_keys(parsed)
+
+    state = dict(previous)
+    state["last_modified"] = record_modified
+    state["groups"] = groups
+    return state, changed
+
+
+def load_state(payload: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Estado gravado no snapshot (JSON) → estado em memória, com as obras como Work.
+    """
+    if payload is None:
+        return None
+    state = dict(payload)
+    state["groups"] = {
+        key: {**parsed, "works": [Work.from_dict(w) for w in parsed["works"]]}
+        for key, parsed in payload.get("groups", {}).items()
+    }
+    return state
+
+
+def _work_json(work: Work) -> Dict[str, Any]:
+    data = work.to_dict()
+    # Citações são anexadas a cada reconstrução e não fazem parte do estado
+    data.pop("cited_by_count", None)
+    return data
+
+
+def dump_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Estado em memória → JSON para o snapshot (inverso de load_state).
+    """
+    payload = dict(state)
+    payload["groups"] = {
+        key: {**parsed, "works": [_work_json(w) for w in parsed["works"]]}
+        for key, parsed in state.get("groups", {}).items()
+    }
+    return payload
+
+
+def merged_works(
+    state: Dict[str, Any]
+) -> Tuple[List[Work], Dict[str, int], List[int], List[Optional[str]]]:
+    """
+    Reconstrói, na ordem do documento, a listagem de obras, o mapa ID → ano,
+    os anos das obras sem ID e o DOI normalizado de cada obra. As obras são
+    as mesmas do estado (carregado a cada reconstrução), sem cópias.
+    """
+    works: List[Work] = []
+    ids: Dict[str, int] = {}
+    no_id_years: List[int] = []
+    dois: List[Optional[str]] = []
+    for parsed in state.get("groups", {}).values():
+        works.extend(parsed["works"])
+        ids.update(parsed["ids"])
+        no_id_years.extend(parsed["no_id_years"])
+        dois.extend(parsed["dois"])
+    return works, ids, no_id_years, dois
+
+
+def reusable_citations(state: Dict[str, Any], changed: Set[str]) -> Dict[str, int]:
+    """
+    Contagens armazenadas que podem ser reaproveitadas: as de IDs que não
+    mudaram e foram consultados há menos de CITATION_TTL.
+    """
+    now = time.time()
+    fetched_at = state.get("citations_at", {})
+    return {
+        key: count
+        for key, count in state.get("citations", {}).items()
+        if key not in changed and now - fetched_at.get(key, 0) <= CITATION_TTL
+    }
+
+
+def store_citations(
+    state: Dict[str, Any],
+    needed: Set[str],
+    stored: Dict[str, int],
+    fetched: Dict[str, int]
+) -> None:
+    """
+    Grava no estado as contagens dos IDs em `needed`: as reaproveitadas
+    mantêm a hora da consulta original; as recém-respondidas recebem a hora
+    atual. IDs sem resposta (lote com falha) não são gravados e serão
+    consultados de novo na próxima reconstrução.
+    """
+    now = time.time()
+    old_at = state.get("citations_at", {})
+    citations: Dict[str, int] = {}
+    fetched_at: Dict[str, float] = {}
+    for key in needed:
+        if key in stored:
+            citations[key] = stored[key]
+            fetched_at[key] = old_at[key]
+        elif key in fetched:
+            citations[key] = fetched[key]
+            fetched_at[key] = now
+    state["citations"] = citations
+    state["citations_at"] = fetched_at
@@ -1,16 +1,14 @@
 # app/utils/utils.py
 
+import datetime
+import io
 import re
-import xml.etree.ElementTree as ET
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, Optional
+from xml.sax.saxutils import XMLGenerator
 
-# <<<<<<< HEAD
-# =======
-import logging
 from fastapi import Response, HTTPException
-from xml.dom.minidom import parseString
+from fastapi.responses import StreamingResponse
 
-# >>>>>>> feature/visualização-de-detalhes-da-pesquisa-do-pesquisador
 # Regex para normalização
 _DOI_RE = re.compile(r"^https?://(?:dx\.)?doi\.org/|^doi:\s*", re.I)
 _ORCID_URL_RE = re.compile(r"^https?://orcid\.org/", re.I)
@@ -33,113 +31,91 @@ def normalize_orcid(orcid: str) -> str:
     return _ORCID_URL_RE.sub("", orcid.strip())
 
 
-# Filtros sobre listas de obras
-def filter_by_year(works: List[Dict[str, Any]], year: int) -> List[Dict[str, Any]]:
+# Cabeçalhos de idade dos dados servidos de snapshot
+def set_age_headers(response: Response, age: float, max_age: float) -> None:
     """
-    Retorna apenas as obras cujo campo 'year' bate com o ano especificado.
+    Informa ao cliente a idade dos dados: `Age` (segundos, RFC 9111),
+    `X-Data-Fetched-At` (ISO 8601, UTC) e `X-Data-Stale` quando a idade
+    passa de `max_age`.
     """
-    resultado: List[Dict[str, Any]] = []
-    for w in works:
-        ano_obra = w.get("year")
-        if isinstance(ano_obra, int) and ano_obra == year:
-            resultado.append(w)
-        elif isinstance(ano_obra, str) and ano_obra.isdigit() and int(ano_obra) == year:
-            resultado.append(w)
-    return resultado
+    fetched_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=age)
+    response.headers["Age"] = str(int(age))
+    response.headers["X-Data-Fetched-At"] = fetched_at.isoformat(timespec="seconds")
+    response.headers["X-Data-Stale"] = "true" if age > max_age else "false"
 
 
-def filter_by_keyword(works: List[Dict[str, Any]], keyword: str) -> List[Dict[str, Any]]:
-    """
-    Retorna apenas as obras que contêm 'keyword' (case-insensitive)
-    no título, abstract/short_description ou na lista de keywords.
-    """
-    sk = keyword.lower()
-    filtrado: List[Dict[str, Any]] = []
-
-    for w in works:
-        match = False
-
-        # Verifica título
-        title = w.get("title", "")
-        if isinstance(title, str) and sk in title.lower():
-            match = True
-
-        # Verifica abstract/short_description
-        if not match:
-            abstract = w.get("short_description") or w.get("abstract") or ""
-            if isinstance(abstract, str) and sk in abstract.lower():
-                match = True
-
-        # Verifica lista de palavras‐chave
-        if not match:
-            for kw_item in w.get("keywords", []):
-                txt: Optional[str] = None
-                if isinstance(kw_item, str):
-                    txt = kw_item
-                elif isinstance(kw_item, dict):
-                    txt = kw_item.get("content")
-                if isinstance(txt, str) and sk in txt.lower():
-                    match = True
-                    break
-
-        if match:
-            filtrado.append(w)
-
-    return filtrado
-
-
-# Conversão de dicionário para XML
-def dict_to_xml(data: Any, root: ET.Element):
+def _xml_tag(key: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_.-]', '_', key)
+
+
+def _xml_children(data: Any, tag: str):
     """
-    Converte recursivamente um dicionário ou lista para elementos XML.
+    Filhos de um elemento: chaves do dict viram tags; itens de lista usam
+    a tag do pai no singular (ou 'item').
     """
     if isinstance(data, dict):
-        for key, value in data.items():
-            safe_key = re.sub(r'[^a-zA-Z0-9_.-]', '_', key)
-            child = ET.SubElement(root, safe_key)
-            dict_to_xml(value, child)
-
-    elif isinstance(data, list):
-        singular_tag = root.tag.rstrip('s')
-        if singular_tag == root.tag:
-            singular_tag = 'item'
-        for item in data:
-            child = ET.SubElement(root, singular_tag)
-            dict_to_xml(item, child)
-
-    else:
-        if data is not None:
-            root.text = str(data)
-
-
-def build_pretty_xml(data: Any, root_tag: str, attrib: Dict[str, str]) -> bytes:
+        return [(_xml_tag(key), value) for key, value in data.items()]
+    singular_tag = tag.rstrip('s')
+    if singular_tag == tag:
+        singular_tag = 'item'
+    return [(singular_tag, item) for item in data]
+
+
+def iter_pretty_xml(
+    data: Any,
+    root_tag: str,
+    attrib: Dict[str, str],
+    indent: str = "  ",
+    chunk_size: int = 64 * 1024
+) -> Iterator[bytes]:
     """
-    Constrói um XML indentado a partir de um dict,
-    usando como elemento raiz `root_tag` e atributos em `attrib`.
-    Retorna bytes UTF-8 com o XML formatado.
+    Gera o XML indentado de `data`, com raiz `root_tag` e atributos em
+    `attrib`, em partes de ~`chunk_size` bytes, escrevendo elemento a
+    elemento com XMLGenerator, sem montar a árvore do documento em memória.
     """
-    root = ET.Element(root_tag, attrib=attrib)
-    dict_to_xml(data, root)
-    rough = ET.tostring(root, 'utf-8')
-    reparsed = parseString(rough)
-    return reparsed.toprettyxml(indent="  ", encoding="utf-8")
-
-
-def xml_response(data: Any, orcid_id: str) -> Response:
+    out = io.StringIO()
+    gen = XMLGenerator(out, encoding="utf-8", short_empty_elements=True)
+
+    def flush() -> bytes:
+        chunk = out.getvalue().encode("utf-8")
+        out.seek(0)
+        out.truncate()
+        return chunk
+
+    def element(tag: str, value: Any, depth: int, attrs: Dict[str, str]) -> Iterator[bytes]:
+        # Indentação via ignorableWhitespace: fecha a tag de abertura pendente
+        gen.ignorableWhitespace(indent * depth)
+        gen.startElement(tag, attrs)
+        if isinstance(value, (dict, list)):
+            children = _xml_children(value, tag)
+            if children:
+                gen.ignorableWhitespace("\n")
+                for child_tag, child in children:
+                    yield from element(child_tag, child, depth + 1, {})
+                gen.ignorableWhitespace(indent * depth)
+        elif value is not None:
+            gen.characters(str(value))
+        gen.endElement(tag)
+        gen.ignorableWhitespace("\n")
+        if out.tell() >= chunk_size:
+            yield flush()
+
+    gen.startDocument()
+    yield from element(root_tag, data, 0, attrib)
+    gen.endDocument()
+    yield flush()
+
+
+def xml_response(data: Any, orcid_id: str) -> StreamingResponse:
     """
-    Gera um Response FastAPI com download de XML para os dados fornecidos.
-    Lança 404 se `data` vazio, 500 em erro interno.
+    Gera um StreamingResponse FastAPI com download de XML para os dados
+    fornecidos, enviado em partes conforme é escrito.
+    Lança 404 se `data` vazio.
     """
     if not data:
         raise HTTPException(status_code=404, detail="ORCID não encontrado")
-    try:
-        xml_bytes = build_pretty_xml(data, 'researcher', {'orcid': orcid_id})
-        return Response(
-            content=xml_bytes,
-            media_type='application/xml',
-            headers={'Content-Disposition': f'attachment; filename="{orcid_id}.xml"'}
-        )
-    except Exception as e:
-        logging.exception(f"Erro ao gerar XML para {orcid_id}: {e}")
-        raise HTTPException(status_code=500, detail=f"Falha ao gerar XML: {e}")
-
+    return StreamingResponse(
+        iter_pretty_xml(data, 'researcher', {'orcid': orcid_id}),
+        media_type='application/xml',
+        headers={'Content-Disposition': f'attachment; filename="{orcid_id}.xml"'}
+    )
@@ -10,12 +10,18 @@ const MetricItemSkeleton = () => (
   </li>
 );
 
-function AggregatedMetrics({ orcidId }) {
-  const [metrics, setMetrics] = useState(null);
-  const [loading, setLoading] = useState(true);
+function AggregatedMetrics({ orcidId, metrics: initialMetrics }) {
+  const [metrics, setMetrics] = useState(initialMetrics ?? null);
+  const [loading, setLoading] = useState(!initialMetrics);
   const [error, setError] = useState(null);
 
   useEffect(() => {
+    // Métricas já carregadas pelo Dashboard (/dashboard): não busca de novo
+    if (initialMetrics) {
+      setMetrics(initialMetrics);
+      setLoading(false);
+      return;
+    }
     if (!orcidId) {
       setLoading(false);
       return;
@@ -39,7 +45,7 @@ function AggregatedMetrics({ orcidId }) {
     }
 
     fetchMetrics();
-  }, [orcidId]);
+  }, [orcidId, initialMetrics]);
 
   const formatNumber = (num) =>
     typeof num === "number"
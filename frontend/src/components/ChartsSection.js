@@ -15,14 +15,20 @@ const ChartSkeleton = () => (
   </div>
 );
 
-function ChartsSection({ orcidId }) {
+function ChartsSection({ orcidId, stats }) {
   const chartRef = useRef(null);
   const chartInstance = useRef(null);
-  const [chartData, setChartData] = useState(null);
-  const [loading, setLoading] = useState(true);
+  const [chartData, setChartData] = useState(stats ?? null);
+  const [loading, setLoading] = useState(!stats);
   const [error, setError] = useState(null);
 
   useEffect(() => {
+    // Série já carregada pelo Dashboard (/dashboard): não busca de novo
+    if (stats) {
+      setChartData(stats);
+      setLoading(false);
+      return;
+    }
     if (!orcidId) {
       setLoading(false);
       return;
@@ -45,7 +51,7 @@ function ChartsSection({ orcidId }) {
     }
 
     fetchStats();
-  }, [orcidId]);
+  }, [orcidId, stats]);
 
   useEffect(() => {
     if (!chartData || loading || error) {
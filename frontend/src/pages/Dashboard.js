@@ -16,6 +16,7 @@ import MenuIcon from "@mui/icons-material/Menu";
 function Dashboard() {
   const { authorId } = useParams();
   const [data, setData] = useState(null);
+  const [dashboard, setDashboard] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [searchTerm, setSearchTerm] = useState("");
@@ -40,25 +41,28 @@ function Dashboard() {
       setLoading(true);
       setError(null);
       try {
-        const res = await fetch(`${API_URL}/orcid/${authorId}/all`);
+        // /dashboard traz obras com citações, métricas e série anual de uma vez
+        const [res, dashRes] = await Promise.all([
+          fetch(`${API_URL}/orcid/${authorId}/all`),
+          fetch(`${API_URL}/orcid/${authorId}/dashboard`),
+        ]);
         if (!res.ok) throw new Error(`Status ${res.status}`);
+        if (!dashRes.ok) throw new Error(`Status ${dashRes.status}`);
         const json = await res.json();
+        const dashJson = await dashRes.json();
 
-        const citRes = await fetch(
-          `${API_URL}/orcid/${authorId}/works/filter_by_citations`
+        const citationsByDoi = new Map(
+          (dashJson.works || [])
+            .filter((w) => w.doi)
+            .map((w) => [w.doi, w.cited_by_count])
         );
-        if (!citRes.ok) throw new Error(`Status ${citRes.status}`);
-        const citJson = await citRes.json();
-        const worksWithCitations = citJson.works_sorted_by_citations;
 
-        const updatedWorks = (json.works || []).map((work) => {
-          const matching = worksWithCitations.find((w) => w.doi === work.doi);
-          return {
-            ...work,
-            cited_by_count: matching?.cited_by_count ?? 0,
-          };
-        });
+        const updatedWorks = (json.works || []).map((work) => ({
+          ...work,
+          cited_by_count: citationsByDoi.get(work.doi) ?? 0,
+        }));
 
+        setDashboard(dashJson);
         setData({
           ...json,
           works: updatedWorks,
@@ -393,9 +397,9 @@ function Dashboard() {
                   <h3 className="section-title chart-title">
                     Crescimento de Produção Científica & Métricas Chave
                   </h3>
-                  <ChartsSection orcidId={authorId} />
+                  <ChartsSection orcidId={authorId} stats={dashboard?.stats} />
                 </div>
-                <AggregatedMetrics orcidId={authorId} />
+                <AggregatedMetrics orcidId={authorId} metrics={dashboard?.metrics} />
               </div>
             ) : (
               <div className="empty-state-metrics">